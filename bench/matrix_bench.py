@@ -0,0 +1,286 @@
+"""Benchmarks of the integration against a simulated AC-MAX-24, in a minimal Home Assistant core.
+
+Measures startup (cold, and warm from the cached topology), state writes per matrix notification,
+command throughput and scene restore latency, without any hardware.  Run from the repository root:
+
+    python bench/matrix_bench.py [--outputs 24] [--inputs 24] [--latency 0] [--burst 1]
+                                 [--report report.json] [--compare baseline.json]
+
+Reports are JSON, and include the integration version and git revision, so runs of different
+versions can be compared with --compare.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from homeassistant import auth, bootstrap, config_entries, loader
+from homeassistant.core import EVENT_STATE_CHANGED, HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.acmax24.const import DOMAIN
+from custom_components.acmax24.hub import HUBS
+from simulator import SimulatedMatrix
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SETTLE_TIMEOUT = 30
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def version() -> dict:
+    with open(os.path.join(REPO, "custom_components", DOMAIN, "manifest.json")) as f:
+        manifest = json.load(f)
+    try:
+        revision = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=REPO, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        revision = None
+    return {"version": manifest["version"], "revision": revision}
+
+
+async def async_start_hass(config_dir) -> HomeAssistant:
+    """A Home Assistant core with just enough loaded to set up the media_player platform."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    hass.auth = await auth.auth_manager_from_config(hass, [], [])
+    await async_setup_component(
+        hass, "http", {"http": {"server_host": "127.0.0.1", "server_port": free_port()}}
+    )
+    await hass.async_start()
+    return hass
+
+
+async def async_wait_for(predicate, timeout=SETTLE_TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Timed out waiting for the integration to settle")
+        await asyncio.sleep(0.002)
+
+
+async def async_settle(hass, hub):
+    """Wait until no notifications are pending or being coalesced, and Home Assistant is idle."""
+    await asyncio.sleep(0.05)
+    await async_wait_for(lambda: hub.dispatcher._unsub_flush is None)
+    await hass.async_block_till_done()
+
+
+async def bench_setup(hass, config) -> dict:
+    started = time.perf_counter()
+    assert await async_setup_component(hass, "media_player", {"media_player": [config]})
+    await hass.async_block_till_done()
+    entities_ready = time.perf_counter() - started
+    hub = hass.data[DOMAIN][HUBS][config["host"]]
+    await async_wait_for(lambda: hub.dispatcher.ready)
+    return {
+        "entities_ready_ms": round(entities_ready * 1000, 1),
+        "hydrated_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def bench_notifications(hass, hub, matrix, count) -> dict:
+    """State writes caused by a dragged volume slider, and by a resend of unchanged config."""
+    writes = []
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, lambda event: writes.append(event))
+    results = {}
+    try:
+        before = hub.dispatcher.notifications
+        started = time.perf_counter()
+        await matrix.async_volume_sweep(1, count)
+        await async_wait_for(lambda: hub.dispatcher.notifications - before >= count)
+        await async_settle(hass, hub)
+        notifications = hub.dispatcher.notifications - before
+        results["volume_sweep"] = {
+            "notifications": notifications,
+            "state_writes": len(writes),
+            "writes_per_notification": round(len(writes) / max(notifications, 1), 3),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+        writes.clear()
+        before = hub.dispatcher.notifications
+        lines = [line for line in matrix._config() if line.startswith("SET OUT")]
+        for line in lines:
+            await matrix.async_broadcast(line)
+        await async_wait_for(lambda: hub.dispatcher.notifications - before >= len(lines))
+        await async_settle(hass, hub)
+        results["unchanged_config"] = {
+            "notifications": hub.dispatcher.notifications - before,
+            "state_writes": len(writes),
+        }
+    finally:
+        unsub()
+    return results
+
+
+async def bench_commands(hass, hub, matrix, rounds) -> dict:
+    """Volume changes on every zone at once, until the (simulated) matrix has applied them all."""
+    zones = hub.matrix_entity.zone_players
+    commands_before = matrix.commands
+    started = time.perf_counter()
+    for n in range(rounds):
+        volume = 20 + n % 60
+        await asyncio.gather(
+            *(
+                hass.services.async_call(
+                    "media_player",
+                    "volume_set",
+                    {"entity_id": zone.entity_id, "volume_level": volume / 100},
+                    blocking=True,
+                )
+                for zone in zones
+            )
+        )
+    await async_wait_for(lambda: all(matrix.volume[zone.zone_id] == volume for zone in zones))
+    elapsed = time.perf_counter() - started
+    calls = rounds * len(zones)
+    return {
+        "service_calls": calls,
+        "device_commands": matrix.commands - commands_before,
+        "calls_per_second": round(calls / elapsed, 1),
+        "duration_ms": round(elapsed * 1000, 1),
+    }
+
+
+async def bench_restore(hass, hub, matrix) -> dict:
+    """Time from calling restore until every zone's state in Home Assistant matches the scene."""
+    entity_id = hub.matrix_entity.entity_id
+    zones = hub.matrix_entity.zone_players
+    await hass.services.async_call(DOMAIN, "snapshot", {"entity_id": entity_id}, blocking=True)
+    saved = {zone.entity_id: (matrix.volume[zone.zone_id], matrix.input_channel[zone.zone_id]) for zone in zones}
+
+    await hass.services.async_call(
+        "media_player", "volume_set", {"entity_id": entity_id, "volume_level": 0.9}, blocking=True
+    )
+    await hass.services.async_call(
+        "media_player", "select_source", {"entity_id": entity_id, "source": "Input 2"}, blocking=True
+    )
+    await async_wait_for(lambda: all(matrix.volume[zone.zone_id] == 90 for zone in zones))
+    await async_settle(hass, hub)
+
+    def restored():
+        for zone in zones:
+            state = hass.states.get(zone.entity_id)
+            volume, input_channel = saved[zone.entity_id]
+            if round(state.attributes.get("volume_level", 0) * 100) != volume:
+                return False
+            if state.attributes.get("source") != f"Input {input_channel}":
+                return False
+        return True
+
+    started = time.perf_counter()
+    await hass.services.async_call(DOMAIN, "restore", {"entity_id": entity_id}, blocking=True)
+    sent = time.perf_counter() - started
+    await async_wait_for(restored)
+    return {
+        "zones": len(zones),
+        "sent_ms": round(sent * 1000, 1),
+        "applied_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def run(args) -> dict:
+    matrix = SimulatedMatrix(args.inputs, args.outputs, args.latency, args.burst)
+    port = await matrix.async_start()
+    config = {
+        "platform": DOMAIN,
+        "host": f"127.0.0.1:{port}",
+        "name": "Bench",
+        "entity_namespace": "bench",
+        "coalesce_window": args.coalesce_window,
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(os.path.join(REPO, "custom_components"), os.path.join(config_dir, "custom_components"))
+
+        hass = await async_start_hass(config_dir)
+        results["setup_cold"] = await bench_setup(hass, config)
+        hub = hass.data[DOMAIN][HUBS][config["host"]]
+        await async_settle(hass, hub)
+        results["notifications"] = await bench_notifications(hass, hub, matrix, args.notifications)
+        results["commands"] = await bench_commands(hass, hub, matrix, args.rounds)
+        await async_settle(hass, hub)
+        results["restore"] = await bench_restore(hass, hub, matrix)
+        await hass.async_stop(force=True)
+
+        # A second start, which creates the entities from the topology cached by the first
+        hass = await async_start_hass(config_dir)
+        results["setup_warm"] = await bench_setup(hass, config)
+        await hass.async_stop(force=True)
+
+    await matrix.async_stop()
+    return {
+        **version(),
+        "params": {
+            "inputs": args.inputs,
+            "outputs": args.outputs,
+            "latency": args.latency,
+            "burst": args.burst,
+            "coalesce_window": args.coalesce_window,
+            "notifications": args.notifications,
+            "rounds": args.rounds,
+        },
+        "results": results,
+    }
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def compare(report, baseline):
+    print(f"Comparing {report['revision']} against {baseline['revision']}")
+    if report["params"] != baseline["params"]:
+        print(f"Warning: parameters differ; baseline was run with {baseline['params']}")
+    old = dict(flatten(baseline["results"]))
+    print(f"{'metric':<56}{'baseline':>12}{'current':>12}{'change':>10}")
+    for metric, value in flatten(report["results"]):
+        base = old.get(metric)
+        change = f"{(value - base) / base * 100:+.1f}%" if base else ""
+        print(f"{metric:<56}{base if base is not None else '-':>12}{value:>12}{change:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inputs", type=int, default=24)
+    parser.add_argument("--outputs", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency (s)")
+    parser.add_argument("--burst", type=int, default=1, help="notifications per change")
+    parser.add_argument("--coalesce-window", type=int, default=100, help="milliseconds")
+    parser.add_argument("--notifications", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--report", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="compare against an earlier JSON report")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
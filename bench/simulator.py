@@ -0,0 +1,170 @@
+"""A stand-in for an AC-MAX-24, speaking the protocol the acmax24 library uses.
+
+Serves the "uart" websocket at /ws/uart and the "cmd" HTTP API at /do?cmd=status from one port, so
+that the integration can be pointed at "127.0.0.1:<port>".  Run it on its own to try the integration
+against it without hardware:
+
+    python bench/simulator.py [--port 8080] [--inputs 24] [--outputs 24] [--latency 0.01]
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from aiohttp import WSMsgType, web
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+
+class SimulatedMatrix:
+    """The state of a simulated matrix, and the websocket clients watching it.
+
+    latency delays every response (as the device takes a while to apply a command), and burst makes
+    each change be reported that many times, as the device does while a volume slider is dragged.
+    """
+
+    def __init__(self, inputs=24, outputs=24, latency=0.0, burst=1):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.latency = latency
+        self.burst = burst
+        self.input_labels = {idx: f"Input {idx}" for idx in range(1, inputs + 1)}
+        self.output_labels = {idx: f"Zone {idx}" for idx in range(1, outputs + 1)}
+        self.volume = {idx: 30 for idx in range(1, outputs + 1)}
+        self.muted = {idx: False for idx in range(1, outputs + 1)}
+        self.input_channel = {idx: 1 for idx in range(1, outputs + 1)}
+        self.signal_status = {idx: 0 for idx in range(1, inputs + 1)}
+        self.commands = 0
+        self.notifications = 0
+        self._clients = set()
+        self._runner = None
+
+    async def async_start(self, host="127.0.0.1", port=0) -> int:
+        """Start serving, and return the port."""
+        app = web.Application()
+        app.router.add_get("/ws/uart", self._handle_ws)
+        app.router.add_get("/do", self._handle_cmd)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return self._runner.addresses[0][1]
+
+    async def async_stop(self):
+        for ws in list(self._clients):
+            await ws.close()
+        await self._runner.cleanup()
+
+    @property
+    def connected(self) -> bool:
+        return bool(self._clients)
+
+    async def _handle_cmd(self, request):
+        if request.query.get("cmd") != "status":
+            raise web.HTTPNotFound()
+        await asyncio.sleep(self.latency)
+        portalias = {
+            "inputsID": [{"port": f"IN {idx}", "id": label} for idx, label in self.input_labels.items()],
+            "outputsAudioID": [
+                {"port": f"OUT {idx}", "id": label} for idx, label in self.output_labels.items()
+            ],
+        }
+        return web.json_response({"info": {"portalias": json.dumps(portalias)}})
+
+    async def _handle_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._clients.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self._handle_message(ws, msg.data)
+        finally:
+            self._clients.discard(ws)
+        return ws
+
+    async def _handle_message(self, ws, message):
+        message = message.strip("\r\n")
+        await asyncio.sleep(self.latency)
+        if message == "GET CONFIG":
+            for line in self._config():
+                await ws.send_str(line + "\r\n")
+        elif message == "GET IN0 SIG STA":
+            for idx, status in self.signal_status.items():
+                await ws.send_str(f"IN{idx} SIG STA {status}\r\n")
+        elif message.startswith("SET OUT"):
+            self.commands += 1
+            await self._apply(message.split(" "))
+        else:
+            await ws.send_str("CMD ERROR\r\n")
+
+    def _config(self):
+        for idx in range(1, 25):
+            yield f"SET IN{idx} {'EN' if idx <= self.inputs else 'DIS'}"
+        for idx in range(1, 25):
+            if idx > self.outputs:
+                yield f"SET OUT{idx} DIS"
+                continue
+            yield f"SET OUT{idx} EN"
+            yield f"SET OUT{idx} VOL {self.volume[idx]}"
+            yield f"SET OUT{idx} {'MUTE' if self.muted[idx] else 'UNMUTE'}"
+            yield f"SET OUT{idx} AS IN{self.input_channel[idx]}"
+        # The library treats this as the end of the configuration
+        yield "SET DHCP ON"
+
+    async def _apply(self, parts):
+        # e.g. SET OUT3 VOL 40, SET OUT3 VOL + 5, SET OUT3 MUTE, SET OUT3 AS IN2
+        idx = int(parts[1][3:])
+        if idx not in self.volume:
+            return
+        if parts[2] == "VOL" and parts[3] in "+-":
+            step = int(parts[4]) if parts[3] == "+" else -int(parts[4])
+            self.volume[idx] = max(0, min(100, self.volume[idx] + step))
+            update = f"SET OUT{idx} VOL {self.volume[idx]}"
+        elif parts[2] == "VOL":
+            self.volume[idx] = int(parts[3])
+            update = f"SET OUT{idx} VOL {self.volume[idx]}"
+        elif parts[2] in ("MUTE", "UNMUTE"):
+            self.muted[idx] = parts[2] == "MUTE"
+            update = f"SET OUT{idx} {parts[2]}"
+        elif parts[2] == "AS":
+            self.input_channel[idx] = int(parts[3][2:])
+            update = f"SET OUT{idx} AS IN{self.input_channel[idx]}"
+        else:
+            return
+        for _ in range(self.burst):
+            await self.async_broadcast(update)
+
+    async def async_broadcast(self, line):
+        """Send a notification to every connected client."""
+        self.notifications += 1
+        for ws in list(self._clients):
+            await ws.send_str(line + "\r\n")
+
+    async def async_volume_sweep(self, idx, count):
+        """Report count volume changes on an output in quick succession, like a dragged slider."""
+        for step in range(count):
+            self.volume[idx] = 10 + step % 80
+            await self.async_broadcast(f"SET OUT{idx} VOL {self.volume[idx]}")
+
+    async def async_set_signal(self, idx, status):
+        self.signal_status[idx] = status
+        await self.async_broadcast(f"IN{idx} SIG STA {status}")
+
+
+async def main(args):
+    matrix = SimulatedMatrix(args.inputs, args.outputs, args.latency, args.burst)
+    port = await matrix.async_start(args.host, args.port)
+    print(f"Simulated AC-MAX-24 listening on {args.host}:{port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--inputs", type=int, default=24)
+    parser.add_argument("--outputs", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--burst", type=int, default=1, help="notifications per change")
+    asyncio.run(main(parser.parse_args()))
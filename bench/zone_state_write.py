@@ -0,0 +1,95 @@
+"""Micro-benchmark of the work a ZoneMediaPlayer does for each state write.
+
+Reads every property Home Assistant evaluates when writing a zone's state, for a zone whose
+current source is mapped to another media_player entity.  Run from the repository root:
+
+    python bench/zone_state_write.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from acmax24 import ACMax24
+from homeassistant.core import HomeAssistant
+
+from custom_components.acmax24.dispatcher import MatrixDispatcher
+from custom_components.acmax24.fades import FadeEngine
+from custom_components.acmax24.groups import ZoneGroups
+from custom_components.acmax24.media_player import ZoneMediaPlayer
+from custom_components.acmax24.source_tracker import SourceEntityTracker
+from custom_components.acmax24.sources import SourceRegistry
+
+SOURCE_ENTITY_ID = "media_player.bench_source"
+
+
+def make_matrix(outputs=24, inputs=24):
+    """Build an ACMax24 with enabled, labelled inputs/outputs, without connecting to anything."""
+    matrix = ACMax24("bench", None)
+    for idx in range(1, inputs + 1):
+        matrix.get_input(idx)._enabled = True
+        matrix.get_input(idx)._label = f"Input {idx}"
+    for idx in range(1, outputs + 1):
+        output = matrix.get_output(idx)
+        output._enabled = True
+        output._label = f"Zone {idx}"
+        output._volume = 30
+        output._input_channel = 1
+    return matrix
+
+
+def write_state(zone):
+    """Evaluate the properties read by Entity._async_write_ha_state."""
+    zone.state
+    zone.capability_attributes
+    zone.state_attributes
+    zone.extra_state_attributes
+    zone.entity_picture
+    zone.supported_features
+    zone.icon
+    zone.name
+
+
+async def main(iterations):
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        matrix = make_matrix()
+        hass.states.async_set(
+            SOURCE_ENTITY_ID,
+            "playing",
+            {
+                "media_title": "Title",
+                "media_artist": "Artist",
+                "media_album_name": "Album",
+                "media_duration": 240,
+                "media_position": 12,
+                "volume_level": 0.5,
+                "entity_picture": "/api/image",
+            },
+        )
+        sources = SourceRegistry(matrix, [i.index for i in matrix.get_enabled_inputs()])
+        zone = ZoneMediaPlayer(
+            "bench",
+            "Bench",
+            matrix,
+            MatrixDispatcher(hass, matrix),
+            sources,
+            matrix.get_output(1),
+            SourceEntityTracker(hass, {"Input 1": SOURCE_ENTITY_ID}),
+            ZoneGroups(),
+            FadeEngine(hass),
+        )
+        zone.hass = hass
+        zone.entity_id = "media_player.bench_zone_1"
+        zone._async_update_source()
+
+        elapsed = timeit.timeit(lambda: write_state(zone), number=iterations)
+        print(f"{iterations} state writes: {elapsed:.3f}s, {elapsed / iterations * 1e6:.1f}us per write")
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
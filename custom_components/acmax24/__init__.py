@@ -1,10 +1,53 @@
 """
 AVPro Edge Audio Matrix Control for Home Assistant
 """
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from .const import CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+from .hub import async_get_hub, async_remove_hub
 
-PLATFORMS = ["media_player"]
+LOG: logging.Logger = logging.getLogger(__package__)
+
+PLATFORMS = ["media_player", "binary_sensor", "sensor"]
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the AVPro Edge Ac-MAX-24 component."""
     return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up an AC-MAX-24 from a config entry, reusing its connection if the entry is reloading."""
+    hostname = entry.data[CONF_HOST]
+    coalesce_window = entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW)
+    hub = async_get_hub(hass, hostname, coalesce_window / 1000)
+    try:
+        ready = await hub.async_setup()
+    except Exception as e:
+        raise ConfigEntryNotReady(f"Error initializing ACMax24 matrix at {hostname}: {e}") from e
+    if not ready:
+        raise ConfigEntryNotReady(f"Initial state not available from matrix at {hostname}")
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    return True
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
+    """Apply changed options by reloading the entities; the hub's connection is kept."""
+    LOG.info(f"Options changed for {entry.title}, reloading")
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload the entities, leaving the hub connected so a reload doesn't start from cold."""
+    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Stop the hub once its entry has been deleted."""
+    async_remove_hub(hass, entry.data[CONF_HOST])
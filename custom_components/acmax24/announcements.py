@@ -0,0 +1,133 @@
+"""Announcements, which briefly route zones to an input and put them back once it goes silent."""
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .commands import CommandBatch
+from .const import ANNOUNCE_START_TIMEOUT
+from .dispatcher import input_key, snapshot_output
+from .optimistic import LatencyStats
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class Announcer:
+    """Plays announcements from an input on some zones of one matrix, one announcement at a time.
+
+    Only the announced zones are snapshotted, in memory, and they are switched to the input (at the
+    announcement volume, unmuted) as a single batch.  Once the input's audio has started and then
+    been silent for off_delay seconds (the same hysteresis as the signal sensors), or the timeout
+    passes, only the settings the announcement changed are put back, and only where nothing else
+    has changed them since.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub, fades, off_delay: float):
+        self._hass = hass
+        self._fades = fades
+        self._matrix = hub.matrix
+        self._dispatcher = hub.dispatcher
+        self._off_delay = off_delay
+        self._lock = asyncio.Lock()
+        self._silence = None
+
+        self.announcements = 0
+        self.timeouts = 0
+        self.commands = 0
+        self.durations = LatencyStats()
+
+    async def async_announce(self, zones, input_idx: int, volume=None, timeout: float = 60):
+        """Announce from an input on the given outputs; returns once they have been put back."""
+        async with self._lock:
+            started = time.monotonic()
+            saved = {idx: snapshot_output(self._matrix.get_output(idx)) for idx in zones}
+            if self._fades:
+                self._fades.async_cancel(zones)
+
+            batch = CommandBatch(self._matrix)
+            for idx, state in saved.items():
+                if state.input_channel != input_idx:
+                    batch.select_source(idx, input_idx)
+                if volume is not None and state.volume != volume:
+                    batch.set_volume(idx, volume)
+                if state.muted:
+                    batch.mute(idx, False)
+            LOG.info(f"Announcing input {input_idx} on zones {sorted(saved)}")
+            self.announcements += 1
+            self.commands += await batch.async_send()
+
+            if not await self._async_wait_for_silence(input_idx, timeout):
+                self.timeouts += 1
+                LOG.warning(f"Announcement on input {input_idx} didn't finish within {timeout}s")
+
+            batch = CommandBatch(self._matrix)
+            for idx, state in saved.items():
+                self._async_queue_restore(batch, idx, state, input_idx, volume)
+            self.commands += await batch.async_send()
+            self.durations.record(time.monotonic() - started)
+            LOG.info(f"Announcement on input {input_idx} finished; restored {len(batch)} settings")
+
+    @callback
+    def _async_queue_restore(self, batch, idx, saved, input_idx, volume):
+        """Queue the settings the announcement changed, unless they have been changed again since."""
+        current = self._matrix.get_output(idx)
+        if 0 < saved.input_channel != input_idx and current.input_channel == input_idx:
+            batch.select_source(idx, saved.input_channel)
+        if volume is not None and 0 <= saved.volume != volume and current.volume == volume:
+            batch.set_volume(idx, saved.volume)
+        if saved.muted and not current.muted:
+            batch.mute(idx, True)
+
+    async def _async_wait_for_silence(self, input_idx: int, timeout: float) -> bool:
+        """Wait for the input's audio to start and then stop; False if that took too long."""
+        silence = self._silence = self._hass.loop.create_future()
+        heard = False
+        unsub_off = None
+
+        @callback
+        def _async_silent(_now=None):
+            if not silence.done():
+                silence.set_result(True)
+
+        @callback
+        def _async_handle_input():
+            nonlocal heard, unsub_off
+            if self._matrix.get_input(input_idx).has_audio:
+                heard = True
+                if unsub_off:
+                    unsub_off()
+                    unsub_off = None
+            elif heard and unsub_off is None:
+                unsub_off = async_call_later(self._hass, self._off_delay, _async_silent)
+
+        @callback
+        def _async_check_started(_now=None):
+            # Nothing to wait for if the announcement never started playing
+            if not heard:
+                LOG.warning(f"No audio on input {input_idx} for the announcement")
+                _async_silent()
+
+        unsub_input = self._dispatcher.async_add_listener(input_key(input_idx), _async_handle_input)
+        unsub_start = async_call_later(
+            self._hass, min(ANNOUNCE_START_TIMEOUT, timeout), _async_check_started
+        )
+        _async_handle_input()
+        try:
+            await asyncio.wait_for(silence, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            unsub_input()
+            unsub_start()
+            if unsub_off:
+                unsub_off()
+            self._silence = None
+
+    @callback
+    def async_stop(self):
+        """End any announcement in progress, restoring its zones straight away."""
+        if self._silence is not None and not self._silence.done():
+            self._silence.set_result(True)
@@ -2,43 +2,110 @@
 import logging
 
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ENTITY_NAMESPACE, CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 from acmax24 import Input
 
+from .const import (
+    CONF_SIGNAL_OFF_DELAY,
+    CONF_SIGNAL_ON_DELAY,
+    DEFAULT_SIGNAL_OFF_DELAY,
+    DEFAULT_SIGNAL_ON_DELAY,
+    DOMAIN,
+)
+from .dispatcher import input_key
+from .hub import HUBS
+
 LOG: logging.Logger = logging.getLogger(__package__)
 
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     if discovery_info is None:
         return
-    from .const import DOMAIN
     namespace = discovery_info["namespace"]
     matrix_name = discovery_info["matrix_name"]
-    matrix = discovery_info["matrix"]
+    hub = hass.data[DOMAIN][HUBS][discovery_info["host"]]
     sensors = [
-        InputSignalSensor(namespace, matrix_name, inp)
-        for inp in matrix.get_enabled_inputs()
+        InputSignalSensor(
+            namespace,
+            matrix_name,
+            hub.dispatcher,
+            hub.matrix.get_input(idx),
+            discovery_info.get(CONF_SIGNAL_ON_DELAY, DEFAULT_SIGNAL_ON_DELAY),
+            discovery_info.get(CONF_SIGNAL_OFF_DELAY, DEFAULT_SIGNAL_OFF_DELAY),
+        )
+        for idx in discovery_info["inputs"]
     ]
-    hass.data.setdefault(DOMAIN, {})["signal_sensors"] = sensors
     async_add_entities(sensors, True)
 
 
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
+    hub = hass.data[DOMAIN][HUBS][entry.data[CONF_HOST]]
+    async_add_entities(
+        InputSignalSensor(
+            entry.data[CONF_ENTITY_NAMESPACE],
+            entry.data[CONF_NAME],
+            hub.dispatcher,
+            hub.matrix.get_input(idx),
+            entry.options.get(CONF_SIGNAL_ON_DELAY, DEFAULT_SIGNAL_ON_DELAY),
+            entry.options.get(CONF_SIGNAL_OFF_DELAY, DEFAULT_SIGNAL_OFF_DELAY),
+        )
+        for idx in hub.input_ids
+    )
+
+
 class InputSignalSensor(BinarySensorEntity):
-    """Reports whether audio is present on an AC-MAX-24 input channel."""
+    """Reports whether audio is present on an AC-MAX-24 input channel.
+
+    A change in the input's signal only turns the sensor on (or off) once it has lasted for on_delay
+    (or off_delay) seconds.  Changes which revert sooner are counted as suppressed flaps, and the
+    state is only written when the sensor actually turns on or off.
+    """
 
     _attr_device_class = BinarySensorDeviceClass.SOUND
     _attr_should_poll = False
 
-    def __init__(self, namespace: str, matrix_name: str, input: Input):
+    def __init__(
+        self,
+        namespace: str,
+        matrix_name: str,
+        dispatcher,
+        input: Input,
+        on_delay: float = DEFAULT_SIGNAL_ON_DELAY,
+        off_delay: float = DEFAULT_SIGNAL_OFF_DELAY,
+    ):
+        self._dispatcher = dispatcher
         self._input = input
+        self._on_delay = on_delay
+        self._off_delay = off_delay
+        self._is_on = input.has_audio
+        self._written_available = None
+        self._unsub_pending = None
+        self.suppressed_flaps = 0
         self._attr_name = f"{input.label} Audio"
         self._attr_unique_id = (
             f"acmax24_{namespace}_{matrix_name}_input_{input.index}_signal"
             .lower().replace(" ", "_")
         )
 
+    async def async_added_to_hass(self):
+        """Subscribe to changes on this input."""
+        self._is_on = self._input.has_audio
+        self._written_available = self.available
+        self.async_on_remove(
+            self._dispatcher.async_add_listener(input_key(self._input.index), self.notify)
+        )
+        self.async_on_remove(self._async_cancel_pending)
+
+    @property
+    def available(self) -> bool:
+        return self._dispatcher.ready
+
     @property
     def is_on(self) -> bool:
-        return self._input.has_audio
+        return self._is_on
 
     @property
     def extra_state_attributes(self) -> dict:
@@ -46,7 +113,42 @@ class InputSignalSensor(BinarySensorEntity):
             "left_channel": bool(self._input.signal_status & 1),
             "right_channel": bool(self._input.signal_status & 2),
             "signal_status": self._input.signal_status,
+            "suppressed_flaps": self.suppressed_flaps,
         }
 
+    @callback
     def notify(self):
-        self.schedule_update_ha_state()
+        has_audio = self._input.has_audio
+        if self.available != self._written_available:
+            # The matrix's state has just arrived, so report it straight away
+            self._async_cancel_pending()
+            self._async_set(has_audio)
+        elif has_audio == self._is_on:
+            if self._unsub_pending:
+                # The signal came back before the delay elapsed
+                self._async_cancel_pending()
+                self.suppressed_flaps += 1
+                LOG.debug(f"Suppressed flap on {self.name}; {self.suppressed_flaps} so far")
+        elif not self._unsub_pending:
+            delay = self._on_delay if has_audio else self._off_delay
+            if delay > 0:
+                self._unsub_pending = async_call_later(self.hass, delay, self._async_commit)
+            else:
+                self._async_set(has_audio)
+
+    @callback
+    def _async_commit(self, _now):
+        self._unsub_pending = None
+        self._async_set(self._input.has_audio)
+
+    @callback
+    def _async_set(self, is_on):
+        self._is_on = is_on
+        self._written_available = self.available
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_pending(self):
+        if self._unsub_pending:
+            self._unsub_pending()
+            self._unsub_pending = None
@@ -0,0 +1,188 @@
+"""Batched command sending for the AC-MAX-24."""
+import asyncio
+import logging
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+# Commands for an output are sent in this order, matching ACMax24.restore_state()
+MUTE = "mute"
+VOLUME = "volume"
+SOURCE = "source"
+
+
+class CommandBatch:
+    """Collects commands for many outputs, and sends them to the matrix as one pipelined batch.
+
+    The matrix offers no acknowledgement other than the state changes pushed back over the websocket,
+    so every command is issued concurrently and the batch is complete once all have been written.  If
+    the same setting is queued twice for an output, only the latest value is sent.
+
+    zones maps output indexes to their zone entities.  The commands for those outputs go through
+    the zone's own queue, replacing anything still waiting to be sent for it, and are shown by the
+    zone until the matrix confirms them; the zones' queues still send concurrently.
+    """
+
+    def __init__(self, matrix, zones=None):
+        self._matrix = matrix
+        self._zones = zones or {}
+        self._commands = {}
+
+    def __len__(self):
+        return len(self._commands)
+
+    def select_source(self, output_idx: int, input_idx: int):
+        self._commands[(output_idx, SOURCE)] = input_idx
+
+    def mute(self, output_idx: int, muted: bool):
+        self._commands[(output_idx, MUTE)] = muted
+
+    def set_volume(self, output_idx: int, volume: int):
+        self._commands[(output_idx, VOLUME)] = max(0, min(100, volume))
+
+    def restore(self, output_idx: int, saved):
+        """Queue only the commands needed to bring an output back to a saved OutputState."""
+        current = self._matrix.get_output(output_idx)
+        if saved.muted != current.muted:
+            self.mute(output_idx, saved.muted)
+        if saved.volume >= 0 and saved.volume != current.volume:
+            self.set_volume(output_idx, saved.volume)
+        if saved.input_channel > 0 and saved.input_channel != current.input_channel:
+            self.select_source(output_idx, saved.input_channel)
+
+    def _coroutine(self, output_idx, kind, value):
+        if kind == SOURCE:
+            return self._matrix.change_input_for_output(output_idx, value)
+        elif kind == MUTE:
+            return self._matrix.mute_output(output_idx, value)
+        return self._matrix.set_output_volume(output_idx, value)
+
+    async def async_send(self) -> int:
+        """Send every queued command, returning how many were sent."""
+        commands, self._commands = self._commands, {}
+        if not commands:
+            return 0
+
+        changes = {}
+        for (idx, kind), value in list(commands.items()):
+            if idx in self._zones:
+                changes.setdefault(idx, {})[kind] = commands.pop((idx, kind))
+        sends = [
+            self._zones[idx].async_queue_change(
+                source=change.get(SOURCE), muted=change.get(MUTE), volume=change.get(VOLUME)
+            )
+            for idx, change in changes.items()
+        ]
+
+        order = (MUTE, VOLUME, SOURCE)
+        keys = sorted(commands, key=lambda k: (order.index(k[1]), k[0]))
+        queued = sum(len(change) for change in changes.values())
+        LOG.debug(f"Sending batch of {len(keys)} commands, and queueing {queued} for zones")
+        results = await asyncio.gather(
+            *(self._coroutine(idx, kind, commands[(idx, kind)]) for idx, kind in keys),
+            *sends,
+            return_exceptions=True,
+        )
+        for (idx, kind), result in zip(keys, results):
+            if isinstance(result, Exception):
+                LOG.warning(f"Failed to send {kind}={commands[(idx, kind)]} for output {idx}: {result}")
+        return len(keys) + queued
+
+
+class OutputCommandQueue:
+    """Per-output command queue with latest-wins semantics.
+
+    Commands which have not yet been sent are merged: volume steps accumulate into a single net
+    delta, and absolute volume, mute and source settings replace any pending value of the same kind.
+    At most max_inflight commands (and one of each kind) are in flight to the matrix at once.  A
+    command which fails to send is logged and counted, and the queue carries on draining, as the
+    callers whose commands were merged into it have already returned.
+    """
+
+    def __init__(self, matrix, output_idx: int, max_inflight: int = 1):
+        self._matrix = matrix
+        self._output_idx = output_idx
+        self._max_inflight = max_inflight
+        self._pending = {}
+        self._step = 0
+        self._inflight = set()
+
+        self.sent = 0
+        self.merged = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of commands waiting to be sent, or in flight."""
+        return len(self._pending) + (1 if self._step else 0) + len(self._inflight)
+
+    async def async_select_source(self, input_idx: int):
+        self._queue(SOURCE, input_idx)
+        await self._async_run()
+
+    async def async_mute(self, muted: bool):
+        self._queue(MUTE, muted)
+        await self._async_run()
+
+    async def async_set_volume(self, volume: int):
+        # An absolute volume supersedes any steps which have not been sent yet
+        if self._step:
+            self.merged += 1
+            self._step = 0
+        self._queue(VOLUME, max(0, min(100, volume)))
+        await self._async_run()
+
+    async def async_step_volume(self, step: int):
+        if VOLUME in self._pending:
+            self._queue(VOLUME, max(0, min(100, self._pending[VOLUME] + step)))
+        else:
+            if self._step:
+                self.merged += 1
+            self._step += step
+            self.max_depth = max(self.max_depth, self.depth)
+        await self._async_run()
+
+    def _queue(self, kind, value):
+        if kind in self._pending:
+            self.merged += 1
+        self._pending[kind] = value
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def _next(self):
+        for kind in (MUTE, VOLUME, SOURCE):
+            if kind in self._inflight:
+                continue
+            if kind in self._pending:
+                return kind, self._pending.pop(kind), False
+            if kind == VOLUME and self._step:
+                step, self._step = self._step, 0
+                return kind, step, True
+        return None
+
+    async def _async_run(self):
+        # Callers which find the queue busy return straight away; their merged command is picked
+        # up by the caller which is already draining it.
+        while len(self._inflight) < self._max_inflight:
+            command = self._next()
+            if command is None:
+                return
+            kind, value, is_step = command
+            self._inflight.add(kind)
+            try:
+                if is_step:
+                    await self._matrix.step_output_volume(self._output_idx, value)
+                elif kind == SOURCE:
+                    await self._matrix.change_input_for_output(self._output_idx, value)
+                elif kind == MUTE:
+                    await self._matrix.mute_output(self._output_idx, value)
+                else:
+                    await self._matrix.set_output_volume(self._output_idx, value)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                LOG.warning(
+                    f"Failed to send {'step' if is_step else kind}={value} for output "
+                    f"{self._output_idx}: {e}"
+                )
+            finally:
+                self._inflight.discard(kind)
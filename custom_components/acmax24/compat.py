@@ -0,0 +1,53 @@
+"""Access to the parts of the acmax24 library which it doesn't expose publicly.
+
+The library has no public API for its transport, for the markers it sets once the initial state
+has arrived, or for setting labels, so these are reached through private attributes of the
+version pinned in manifest.json.  Each access goes through getattr, so that if a later version
+renames one, the feature which needs it is skipped with a warning instead of raising.
+"""
+import logging
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+LIBRARY_VERSION = "0.2.10"
+
+_warned = set()
+
+
+def _warn_missing(obj, name: str):
+    key = (type(obj).__name__, name)
+    if key not in _warned:
+        _warned.add(key)
+        LOG.warning(
+            f"acmax24 {key[0]} has no {name} (this integration was built against acmax24 "
+            f"{LIBRARY_VERSION}); the features which need it are disabled"
+        )
+
+
+def get_private(obj, name: str, default=None):
+    """Read a private attribute of a library object, or return default if it doesn't exist."""
+    try:
+        return getattr(obj, name)
+    except AttributeError:
+        _warn_missing(obj, name)
+        return default
+
+
+def set_private(obj, name: str, value) -> bool:
+    """Set a private attribute of a library object, only if it exists; False if it doesn't."""
+    if not hasattr(obj, name):
+        _warn_missing(obj, name)
+        return False
+    setattr(obj, name, value)
+    return True
+
+
+def get_transport(matrix):
+    """The matrix's websocket transport, or None."""
+    return get_private(matrix, "_transport")
+
+
+def transport_socket(matrix):
+    """The transport's current websocket, or None if it isn't connected (or can't be seen)."""
+    transport = get_transport(matrix)
+    return get_private(transport, "socket") if transport is not None else None
@@ -0,0 +1,156 @@
+"""Config and options flows for the AVPro Edge AC-MAX-24."""
+import logging
+
+import voluptuous as vol
+from homeassistant import config_entries
+from homeassistant.const import CONF_ENTITY_NAMESPACE, CONF_HOST, CONF_NAME
+from homeassistant.core import callback
+from homeassistant.helpers import selector
+from acmax24 import ACMax24
+
+from .const import (
+    CONF_AUTO_ROUTES,
+    CONF_COALESCE_WINDOW,
+    CONF_DIAGNOSTICS,
+    CONF_LABEL_REFRESH_INTERVAL,
+    CONF_MAX_INFLIGHT,
+    CONF_MAX_SCENES,
+    CONF_MIRROR_ATTRIBUTES,
+    CONF_SIGNAL_OFF_DELAY,
+    CONF_SIGNAL_ON_DELAY,
+    CONF_SOURCE_ENTITY_MAP,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_LABEL_REFRESH_INTERVAL,
+    DEFAULT_MAX_INFLIGHT,
+    DEFAULT_MAX_SCENES,
+    DEFAULT_NAME,
+    DEFAULT_NAMESPACE,
+    DEFAULT_SIGNAL_OFF_DELAY,
+    DEFAULT_SIGNAL_ON_DELAY,
+    DOMAIN,
+    MIRROR_ATTRIBUTES,
+)
+from .labels import async_update_labels
+from .media_player import PLATFORM_SCHEMA
+from .routing import AUTO_ROUTES_SCHEMA
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class ACMax24ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+    """Add an AC-MAX-24 by hostname.
+
+    The entity namespace is only set here, since the unique ids of the entities are derived from it.
+    """
+
+    VERSION = 1
+
+    async def async_step_user(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            hostname = user_input[CONF_HOST]
+            await self.async_set_unique_id(hostname)
+            self._abort_if_unique_id_configured()
+
+            # Fetching the labels is a cheap way to check the matrix is there, without connecting
+            if await async_update_labels(self.hass, ACMax24(hostname, None), hostname):
+                return self.async_create_entry(title=user_input[CONF_NAME], data=user_input)
+            errors["base"] = "cannot_connect"
+
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOST): str,
+                    vol.Optional(CONF_NAME, default=DEFAULT_NAME): str,
+                    vol.Optional(CONF_ENTITY_NAMESPACE, default=DEFAULT_NAMESPACE): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return ACMax24OptionsFlow(config_entry)
+
+
+class ACMax24OptionsFlow(config_entries.OptionsFlow):
+    """Options which are applied by reloading the entities, without reconnecting to the matrix."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            try:
+                AUTO_ROUTES_SCHEMA(user_input.get(CONF_AUTO_ROUTES, []))
+            except vol.Invalid:
+                errors[CONF_AUTO_ROUTES] = "invalid_auto_routes"
+            else:
+                # Checked against the same schema the entities are set up with, so that options
+                # which would stop the entry loading (such as a bad source_entity_map) are refused
+                try:
+                    PLATFORM_SCHEMA({"platform": DOMAIN, **self._entry.data, **user_input})
+                except vol.Invalid as e:
+                    key = e.path[0] if e.path and e.path[0] in user_input else "base"
+                    LOG.debug(f"Refusing options for {self._entry.title}: {e}")
+                    errors[key] = (
+                        "invalid_source_entity_map"
+                        if key == CONF_SOURCE_ENTITY_MAP
+                        else "invalid_option"
+                    )
+                else:
+                    return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_SOURCE_ENTITY_MAP, default=options.get(CONF_SOURCE_ENTITY_MAP, {})
+                    ): selector.ObjectSelector(),
+                    vol.Optional(
+                        CONF_MIRROR_ATTRIBUTES,
+                        default=options.get(CONF_MIRROR_ATTRIBUTES, list(MIRROR_ATTRIBUTES)),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(options=list(MIRROR_ATTRIBUTES), multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_COALESCE_WINDOW,
+                        default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+                    vol.Optional(
+                        CONF_LABEL_REFRESH_INTERVAL,
+                        default=options.get(
+                            CONF_LABEL_REFRESH_INTERVAL,
+                            int(DEFAULT_LABEL_REFRESH_INTERVAL.total_seconds()),
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=60)),
+                    vol.Optional(
+                        CONF_MAX_SCENES, default=options.get(CONF_MAX_SCENES, DEFAULT_MAX_SCENES)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_MAX_INFLIGHT,
+                        default=options.get(CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=4)),
+                    vol.Optional(
+                        CONF_SIGNAL_ON_DELAY,
+                        default=options.get(CONF_SIGNAL_ON_DELAY, DEFAULT_SIGNAL_ON_DELAY),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=300)),
+                    vol.Optional(
+                        CONF_SIGNAL_OFF_DELAY,
+                        default=options.get(CONF_SIGNAL_OFF_DELAY, DEFAULT_SIGNAL_OFF_DELAY),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=300)),
+                    vol.Optional(
+                        CONF_AUTO_ROUTES, default=options.get(CONF_AUTO_ROUTES, [])
+                    ): selector.ObjectSelector(),
+                    vol.Optional(
+                        CONF_DIAGNOSTICS, default=options.get(CONF_DIAGNOSTICS, False)
+                    ): bool,
+                }
+            ),
+            errors=errors,
+        )
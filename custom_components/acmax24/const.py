@@ -1,6 +1,92 @@
+from datetime import timedelta
+
 DOMAIN = "acmax24"
 
 SERVICE_SNAPSHOT = "snapshot"
 SERVICE_RESTORE = "restore"
+SERVICE_REFRESH = "refresh"
+SERVICE_FADE = "fade"
+SERVICE_ANNOUNCE = "announce"
+
+ATTR_SCENE = "scene"
+ATTR_ZONES = "zones"
+ATTR_VOLUME_LEVEL = "volume_level"
+ATTR_DURATION = "duration"
+ATTR_SOURCE = "source"
+ATTR_TIMEOUT = "timeout"
 
 CONF_TTY = "tty"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_LABEL_REFRESH_INTERVAL = "label_refresh_interval"
+CONF_MAX_SCENES = "max_scenes"
+CONF_MAX_INFLIGHT = "max_inflight_commands"
+CONF_SOURCE_ENTITY_MAP = "source_entity_map"
+CONF_MIRROR_ATTRIBUTES = "mirror_attributes"
+CONF_SIGNAL_ON_DELAY = "signal_on_delay"
+CONF_SIGNAL_OFF_DELAY = "signal_off_delay"
+CONF_AUTO_ROUTES = "auto_routes"
+CONF_INPUT = "input"
+CONF_ZONES = "zones"
+CONF_VOLUME = "volume"
+CONF_REVERT_AFTER = "revert_after"
+CONF_DIAGNOSTICS = "diagnostics"
+
+DEFAULT_NAME = "AVPro Edge AC-MAX-24"
+DEFAULT_NAMESPACE = "acmax24"
+
+# Milliseconds to gather a burst of matrix notifications before writing state
+DEFAULT_COALESCE_WINDOW = 100
+
+# Labels are the only state not pushed by the matrix, and they rarely change
+DEFAULT_LABEL_REFRESH_INTERVAL = timedelta(hours=1)
+
+# Attributes of a zone's mapped source entity which the zone can mirror; all are mirrored by default
+MIRROR_ATTRIBUTES = (
+    "media_title",
+    "media_artist",
+    "media_album_name",
+    "media_duration",
+    "media_position",
+    "entity_picture",
+    "source_volume_level",
+)
+
+# Mirrored attributes which change constantly while a source plays.  They are not recorded, and a
+# change to only these doesn't write the zone's state; media_position_updated_at goes with
+# media_position, so the frontend can still extrapolate the position
+HIGH_CHURN_ATTRIBUTES = frozenset(
+    ("media_position", "media_position_updated_at", "source_volume_level")
+)
+
+DEFAULT_SCENE = "default"
+DEFAULT_MAX_SCENES = 20
+
+# Seconds an input's audio must be present (or absent) before its signal sensor turns on (or off),
+# so that quiet passages and gaps between tracks don't make the sensor flap
+DEFAULT_SIGNAL_ON_DELAY = 0
+DEFAULT_SIGNAL_OFF_DELAY = 5
+
+# Commands in flight to the matrix at once, per output
+DEFAULT_MAX_INFLIGHT = 1
+
+# Time between the steps of a volume fade, which bounds the rate of volume commands to each zone
+FADE_INTERVAL = timedelta(milliseconds=250)
+
+# Seconds an announcement may last, and may take to start playing, before its zones are put back
+DEFAULT_ANNOUNCE_TIMEOUT = 60
+ANNOUNCE_START_TIMEOUT = 10
+
+# Seconds to show a zone's intended state while waiting for the matrix to confirm a command
+OPTIMISTIC_TIMEOUT = 3
+
+# Seconds between checks for the matrix's initial state, when starting from the cached topology
+HYDRATE_TIMEOUT = 10
+
+# Connection health checks, and backoff (in seconds) when restarting a dead transport; each delay
+# is jittered between half and all of its value, so matrices restart out of step
+HEALTH_CHECK_INTERVAL = timedelta(seconds=10)
+RESTART_BACKOFF_MIN = 5
+RESTART_BACKOFF_MAX = 300
+
+# Seconds to wait for the matrix to resend its configuration after reconnecting
+RESYNC_TIMEOUT = 10
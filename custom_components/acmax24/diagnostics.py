@@ -0,0 +1,90 @@
+"""Diagnostics for the AVPro Edge AC-MAX-24."""
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .hub import HUBS
+from .optimistic import LatencyStats
+
+
+def command_latency(hub) -> dict:
+    """Command round-trip times per operation, across every zone, plus scene restores."""
+    totals = {}
+    zones = hub.matrix_entity.zone_players if hub.matrix_entity else []
+    for zone in zones:
+        for operation, stats in zone.command_latency.items():
+            total = totals.setdefault(operation, LatencyStats())
+            total.count += stats.count
+            total.total += stats.total
+            total.max = max(total.max, stats.max)
+            total.timeouts += stats.timeouts
+            if stats.last is not None:
+                total.last = stats.last
+    if hub.matrix_entity and hub.matrix_entity.restore_latency.count:
+        totals["restore_state"] = hub.matrix_entity.restore_latency
+    return {operation: stats.as_dict() for operation, stats in totals.items()}
+
+
+def collect_diagnostics(hub) -> dict:
+    """Everything measured about a hub's connection, dispatch and commands."""
+    dispatcher = hub.dispatcher
+    uptime = time.monotonic() - hub.started_at if hub.started_at else None
+    zones = hub.matrix_entity.zone_players if hub.matrix_entity else []
+    data = {
+        "connection": hub.health,
+        "startup": hub.startup,
+        "uptime": uptime,
+        "dispatch": {
+            "ready": dispatcher.ready,
+            "coalesce_window": dispatcher.window,
+            "notifications": dispatcher.notifications,
+            "notify_rate": dispatcher.notifications / uptime if uptime else None,
+            "batches": dispatcher.batches,
+            "max_batch_size": dispatcher.max_batch_size,
+            "dispatched_updates": dispatcher.dispatched_updates,
+            "suppressed_updates": dispatcher.suppressed_updates,
+            "dispatch_latency": (
+                dispatcher.dispatch_latency.as_dict() if dispatcher.dispatch_latency else None
+            ),
+            "listener_time": dispatcher.listener_time.as_dict() if dispatcher.listener_time else None,
+        },
+        "label_fetch": hub.label_fetches.as_dict(),
+        "commands": {
+            "latency": command_latency(hub),
+            "sent": sum(zone.command_queue.sent for zone in zones),
+            "merged": sum(zone.command_queue.merged for zone in zones),
+            "failed": sum(zone.command_queue.failed for zone in zones),
+            "max_queue_depth": max((zone.command_queue.max_depth for zone in zones), default=0),
+            "queue_depth": {zone.entity_id: zone.command_queue_depth for zone in zones},
+        },
+        "source_writes_suppressed": sum(zone.suppressed_writes for zone in zones),
+    }
+    if hub.fades:
+        data["fades"] = {
+            "active": hub.fades.active,
+            "started": hub.fades.started,
+            "completed": hub.fades.completed,
+            "cancelled": hub.fades.cancelled,
+            "commands": hub.fades.commands,
+        }
+    if hub.announcer:
+        data["announcements"] = {
+            "count": hub.announcer.announcements,
+            "timeouts": hub.announcer.timeouts,
+            "commands": hub.announcer.commands,
+            "duration": hub.announcer.durations.as_dict(),
+        }
+    if hub.auto_router:
+        data["auto_routing"] = {
+            "activations": hub.auto_router.activations,
+            "reverts": hub.auto_router.reverts,
+        }
+    return data
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    hub = hass.data[DOMAIN][HUBS][entry.data[CONF_HOST]]
+    return {"options": dict(entry.options), **collect_diagnostics(hub)}
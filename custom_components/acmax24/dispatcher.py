@@ -0,0 +1,197 @@
+"""Change tracking and dispatch for AC-MAX-24 push notifications."""
+import logging
+import time
+from collections import namedtuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .instrumentation import LatencyHistogram
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+# Listener key used by entities interested in any input/output label change
+LABELS = "labels"
+# Listener key used by entities interested in any output change; woken at most once per pass
+OUTPUTS = "outputs"
+
+OutputState = namedtuple("OutputState", ["input_channel", "volume", "muted", "label"])
+InputState = namedtuple("InputState", ["signal_status", "label"])
+
+
+def output_key(idx):
+    return ("output", idx)
+
+
+def input_key(idx):
+    return ("input", idx)
+
+
+def snapshot_output(output) -> OutputState:
+    return OutputState(output.input_channel, output.volume, output.muted, output.label)
+
+
+def snapshot_input(input) -> InputState:
+    return InputState(input.signal_status, input.label)
+
+
+class MatrixDispatcher:
+    """Diffs the matrix state on each notification and wakes only the listeners whose state changed.
+
+    The acmax24 library calls back from its own transport thread and does not say what changed, so
+    we keep a compact snapshot of every enabled input and output and compare against it.  Bursts of
+    notifications arriving within the coalescing window (in seconds) are merged into a single pass.
+    """
+
+    def __init__(self, hass: HomeAssistant, matrix, window: float = 0):
+        self._hass = hass
+        self._matrix = matrix
+        self.window = window
+        self._listeners = {}
+        self._outputs = {}
+        self._inputs = {}
+        self._pending = 0
+        self._unsub_flush = None
+        self._pending_since = None
+        self.ready = False
+
+        self.notifications = 0
+        self.dispatched_updates = 0
+        self.suppressed_updates = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+
+        # Only collected while instrumentation is enabled; see async_set_instrumentation
+        self.dispatch_latency = None
+        self.listener_time = None
+
+    @callback
+    def async_set_instrumentation(self, enabled: bool):
+        """Start (or stop) timing each dispatch pass, from the first notification to its listeners."""
+        if not enabled:
+            self.dispatch_latency = self.listener_time = None
+        elif self.dispatch_latency is None:
+            self.dispatch_latency = LatencyHistogram()
+            self.listener_time = LatencyHistogram()
+
+    def async_add_listener(self, key, listener):
+        """Register a callback for a key; returns a function which removes it again."""
+        listeners = self._listeners.setdefault(key, [])
+        listeners.append(listener)
+
+        def remove():
+            listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_set_ready(self):
+        """Take the initial snapshot once the matrix state is available, and wake every listener.
+
+        Notifications are ignored until then, and entities report themselves as unavailable.
+        """
+        self._outputs = {o.index: snapshot_output(o) for o in self._matrix.get_enabled_outputs()}
+        self._inputs = {i.index: snapshot_input(i) for i in self._matrix.get_enabled_inputs()}
+        self.ready = True
+        for listeners in list(self._listeners.values()):
+            for listener in list(listeners):
+                listener()
+
+    @callback
+    def async_wake(self, key):
+        """Wake the listeners for a key which isn't derived from the matrix state."""
+        for listener in list(self._listeners.get(key, ())):
+            listener()
+
+    def notify(self):
+        """Entry point for the library notify callback; safe to call from any thread."""
+        self._hass.loop.call_soon_threadsafe(self.async_schedule)
+
+    @callback
+    def async_schedule(self):
+        """Record a notification, and flush now or once the coalescing window expires."""
+        if not self.ready:
+            return
+        self.notifications += 1
+        if not self._pending and self.dispatch_latency is not None:
+            self._pending_since = time.monotonic()
+        self._pending += 1
+        if self.window <= 0:
+            self._async_flush()
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self._hass, self.window, self._async_flush)
+
+    @callback
+    def async_shutdown(self):
+        """Cancel any pending flush."""
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def async_flush(self):
+        """Dispatch any coalesced notifications now, rather than when the window expires."""
+        if self._unsub_flush is None:
+            return
+        self._unsub_flush()
+        self._async_flush()
+
+    @callback
+    def _async_flush(self, _now=None):
+        self._unsub_flush = None
+        batch_size, self._pending = self._pending, 0
+        self.batches += 1
+        self.last_batch_size = batch_size
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        if batch_size > 1:
+            LOG.debug(f"Coalesced {batch_size} notifications into one dispatch pass")
+        self.async_process()
+        if self.dispatch_latency is not None and self._pending_since is not None:
+            self.dispatch_latency.record(time.monotonic() - self._pending_since)
+        self._pending_since = None
+
+    @callback
+    def async_process(self):
+        """Diff the matrix against the last snapshot, and wake the affected listeners."""
+        changed = self._async_diff()
+
+        woken = 0
+        started = time.monotonic() if self.listener_time is not None else None
+        for key in changed:
+            for listener in list(self._listeners.get(key, ())):
+                listener()
+                woken += 1
+        if started is not None:
+            self.listener_time.record(time.monotonic() - started)
+
+        total = sum(len(listeners) for listeners in self._listeners.values())
+        self.dispatched_updates += woken
+        self.suppressed_updates += total - woken
+        LOG.debug(
+            f"Dispatched notification to {woken}/{total} listeners; changed={changed}, "
+            f"suppressed so far={self.suppressed_updates}"
+        )
+
+    def _async_diff(self):
+        changed = set()
+        for output in self._matrix.get_enabled_outputs():
+            new = snapshot_output(output)
+            old = self._outputs.get(output.index)
+            if new != old:
+                self._outputs[output.index] = new
+                changed.add(output_key(output.index))
+                changed.add(OUTPUTS)
+                if old is not None and old.label != new.label:
+                    changed.add(LABELS)
+
+        for input in self._matrix.get_enabled_inputs():
+            new = snapshot_input(input)
+            old = self._inputs.get(input.index)
+            if new != old:
+                self._inputs[input.index] = new
+                changed.add(input_key(input.index))
+                if old is not None and old.label != new.label:
+                    changed.add(LABELS)
+
+        return changed
@@ -0,0 +1,150 @@
+"""Timed volume fades for the zones of an AC-MAX-24."""
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import FADE_INTERVAL
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class Fade:
+    """A ramp of one zone's volume from start to target, over duration seconds."""
+
+    __slots__ = ("zone", "start", "target", "started", "duration", "last", "cancelled", "done")
+
+    def __init__(self, zone, start: int, target: int, duration: float, done: asyncio.Future):
+        self.zone = zone
+        self.start = start
+        self.target = target
+        self.started = time.monotonic()
+        self.duration = duration
+        self.last = start
+        self.cancelled = False
+        self.done = done
+
+    def volume(self, now: float):
+        """The volume for this point in the ramp, and whether the ramp is complete."""
+        if now - self.started >= self.duration:
+            return self.target, True
+        progress = (now - self.started) / self.duration
+        return round(self.start + (self.target - self.start) * progress), False
+
+
+class FadeEngine:
+    """Runs every active fade of one matrix from a single timer on the event loop.
+
+    Each tick works out every fade's volume from the time elapsed, and sends only the volumes which
+    changed, through each zone's latest-wins command queue; a slow matrix is sent the newest volume
+    rather than a backlog.  Ticks are FADE_INTERVAL apart, which bounds the command rate per zone.
+    Fades are keyed by output index, and a fade is cancelled by any other volume change to its zone.
+    """
+
+    def __init__(self, hass: HomeAssistant, interval=FADE_INTERVAL):
+        self._hass = hass
+        self._interval = interval
+        self._fades = {}  # output index -> Fade
+        self._unsub_tick = None
+
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.commands = 0
+
+    @property
+    def active(self) -> int:
+        return len(self._fades)
+
+    @callback
+    def async_fade(self, targets: dict, duration: float) -> asyncio.Future:
+        """Fade each zone (mapped to its target volume, 0..100) from its current volume.
+
+        Returns a future which resolves once every fade is over, to a list of True for each fade
+        which completed and False for each which was cancelled.
+        """
+        done = []
+        for zone, target in targets.items():
+            start = zone.matrix_volume
+            if start < 0:
+                LOG.warning(f"Not fading {zone.zone_info}, as its volume isn't known yet")
+                continue
+            self._async_cancel_one(zone.zone_id)
+            future = self._hass.loop.create_future()
+            self._fades[zone.zone_id] = Fade(zone, start, max(0, min(100, target)), duration, future)
+            self.started += 1
+            done.append(future)
+        LOG.debug(f"Fading {len(done)} zones over {duration}s; {self.active} fades active")
+
+        if self._fades and self._unsub_tick is None:
+            self._unsub_tick = async_track_time_interval(
+                self._hass, self._async_tick, self._interval
+            )
+        self._async_tick()
+        return asyncio.gather(*done)
+
+    @callback
+    def async_cancel(self, output_ids):
+        """Stop any fades of the given outputs, leaving their volume where it has got to."""
+        for idx in output_ids:
+            self._async_cancel_one(idx)
+
+    @callback
+    def async_stop(self):
+        self.async_cancel(list(self._fades))
+
+    @callback
+    def _async_cancel_one(self, idx):
+        fade = self._fades.pop(idx, None)
+        if fade is None:
+            return
+        self.cancelled += 1
+        fade.cancelled = True
+        fade.done.set_result(False)
+        LOG.debug(f"Cancelled fade of {fade.zone.zone_info} at volume {fade.last}")
+        if not self._fades:
+            self._async_stop_ticking()
+
+    @callback
+    def _async_stop_ticking(self):
+        if self._unsub_tick:
+            self._unsub_tick()
+            self._unsub_tick = None
+
+    @callback
+    def _async_tick(self, _now=None):
+        now = time.monotonic()
+        changes = []
+        completed = []
+        for idx, fade in list(self._fades.items()):
+            volume, complete = fade.volume(now)
+            if volume != fade.last:
+                fade.last = volume
+                changes.append((fade, volume))
+            if complete:
+                del self._fades[idx]
+                self.completed += 1
+                completed.append(fade)
+
+        if not self._fades:
+            self._async_stop_ticking()
+        if changes:
+            self.commands += len(changes)
+            self._hass.async_create_task(self._async_send(changes, completed))
+        else:
+            for fade in completed:
+                fade.done.set_result(True)
+
+    async def _async_send(self, changes, completed):
+        await asyncio.gather(*(self._async_set_volume(fade, volume) for fade, volume in changes))
+        # Completed fades are only over once their final volume has been sent
+        for fade in completed:
+            fade.done.set_result(True)
+
+    async def _async_set_volume(self, fade, volume):
+        # Checked as the command is queued, so a fade cancelled since this tick doesn't overwrite the
+        # change which cancelled it
+        if not fade.cancelled:
+            await fade.zone.command_queue.async_set_volume(volume)
@@ -0,0 +1,125 @@
+"""Zone groups for an AC-MAX-24, where commands to a leader zone are fanned out to its members."""
+import logging
+
+from homeassistant.core import callback
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class ZoneGroups:
+    """The zones of one matrix which are joined to a leader zone.
+
+    Each zone is in at most one group.  Members keep their volume offset from the leader (as it was
+    when they joined, or when their volume was last set directly), so the group's volume can be
+    changed without flattening the balance between rooms.
+    """
+
+    def __init__(self):
+        self._zones = {}  # entity_id -> zone
+        self._leaders = {}  # entity_id -> entity_id of its group's leader
+        self._groups = {}  # leader entity_id -> [leader entity_id, member entity_id, ...]
+        self._offsets = {}  # member entity_id -> volume offset from the leader
+
+    @callback
+    def async_add_zone(self, zone):
+        """Make a zone available for grouping; returns a callback which removes it again."""
+        self._zones[zone.entity_id] = zone
+
+        @callback
+        def remove():
+            self.async_unjoin(zone)
+            self._zones.pop(zone.entity_id, None)
+
+        return remove
+
+    def members(self, zone) -> list:
+        """Entity ids of the zone's group, leader first; empty if the zone isn't grouped."""
+        leader = self._leaders.get(zone.entity_id)
+        return list(self._groups[leader]) if leader else []
+
+    def led_by(self, zone) -> list:
+        """The zones of the group this zone leads, leader first; empty if it isn't a leader."""
+        return [self._zones[entity_id] for entity_id in self._groups.get(zone.entity_id, ())]
+
+    def offset(self, zone) -> int:
+        return self._offsets.get(zone.entity_id, 0)
+
+    @callback
+    def async_join(self, leader, entity_ids):
+        """Join zones (by entity id) to the group led by leader, creating it if needed."""
+        before = self._async_snapshot()
+        if leader.entity_id not in self._groups:
+            # The leader can't also be a member of someone else's group
+            self._async_leave(leader.entity_id)
+            self._groups[leader.entity_id] = [leader.entity_id]
+            self._leaders[leader.entity_id] = leader.entity_id
+
+        group = self._groups[leader.entity_id]
+        for entity_id in entity_ids:
+            zone = self._zones.get(entity_id)
+            if zone is None:
+                LOG.warning(f"Cannot join {entity_id} to {leader.entity_id}; not a zone of the same matrix")
+                continue
+            if entity_id in group:
+                continue
+            self._async_leave(entity_id)
+            group.append(entity_id)
+            self._leaders[entity_id] = leader.entity_id
+            self._offsets[entity_id] = self._volume_offset(leader, zone)
+
+        if len(group) == 1:
+            self._async_leave(leader.entity_id)
+        LOG.info(f"Zone group led by {leader.entity_id} is now {self.members(leader)}")
+        self._async_write_changed(before)
+
+    @callback
+    def async_unjoin(self, zone):
+        """Remove a zone from its group; unjoining the leader dissolves the group."""
+        if zone.entity_id not in self._leaders:
+            return
+        before = self._async_snapshot()
+        self._async_leave(zone.entity_id)
+        self._async_write_changed(before)
+
+    @callback
+    def async_set_member_volume(self, zone, volume: int):
+        """Record a member's new offset, after its volume has been set directly."""
+        leader = self._leaders.get(zone.entity_id)
+        if leader is not None and leader != zone.entity_id:
+            self._offsets[zone.entity_id] = self._volume_offset(self._zones[leader], volume=volume)
+
+    def _volume_offset(self, leader, zone=None, volume=None) -> int:
+        if volume is None:
+            volume = zone.matrix_volume
+        if volume < 0 or leader.matrix_volume < 0:
+            return 0
+        return volume - leader.matrix_volume
+
+    @callback
+    def _async_leave(self, entity_id):
+        leader = self._leaders.get(entity_id)
+        if leader is None:
+            return
+        if leader == entity_id:
+            for member in self._groups.pop(leader):
+                self._leaders.pop(member, None)
+                self._offsets.pop(member, None)
+            return
+        self._groups[leader].remove(entity_id)
+        del self._leaders[entity_id]
+        self._offsets.pop(entity_id, None)
+        if len(self._groups[leader]) == 1:
+            # A leader with no members isn't a group
+            self._async_leave(leader)
+
+    def _async_snapshot(self):
+        return {entity_id: tuple(self._groups[leader]) for entity_id, leader in self._leaders.items()}
+
+    @callback
+    def _async_write_changed(self, before):
+        """Write the state of every zone whose group_members have changed."""
+        after = self._async_snapshot()
+        for entity_id in before.keys() | after.keys():
+            zone = self._zones.get(entity_id)
+            if zone is not None and zone.hass and before.get(entity_id) != after.get(entity_id):
+                zone.async_write_ha_state()
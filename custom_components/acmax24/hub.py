@@ -0,0 +1,394 @@
+"""Per-host connection management for AC-MAX-24 matrices."""
+import asyncio
+import logging
+import random
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from acmax24 import ACMax24
+
+from .compat import get_private, get_transport, set_private, transport_socket
+from .const import (
+    DOMAIN,
+    HEALTH_CHECK_INTERVAL,
+    HYDRATE_TIMEOUT,
+    RESTART_BACKOFF_MAX,
+    RESTART_BACKOFF_MIN,
+    RESYNC_TIMEOUT,
+)
+from .dispatcher import LABELS, MatrixDispatcher
+from .labels import apply_labels, async_update_labels
+from .optimistic import LatencyStats
+from .sources import SourceRegistry
+from .topology import TopologyStore
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+HUBS = "hubs"
+
+# Listener key woken when a hub's connection health changes
+CONNECTION = "connection"
+
+
+@callback
+def async_get_hub(hass: HomeAssistant, hostname: str, coalesce_window: float = 0):
+    """Return the hub for a host, creating it if this is the first time it has been configured."""
+    hubs = hass.data.setdefault(DOMAIN, {}).setdefault(HUBS, {})
+    hub = hubs.get(hostname)
+    if hub is None:
+        hub = hubs[hostname] = MatrixHub(hass, hostname, coalesce_window)
+    else:
+        hub.dispatcher.window = coalesce_window
+    return hub
+
+
+@callback
+def async_remove_hub(hass: HomeAssistant, hostname: str):
+    """Stop and forget the hub for a host, once nothing is configured to use it."""
+    hub = hass.data.get(DOMAIN, {}).get(HUBS, {}).pop(hostname, None)
+    if hub:
+        hub.async_stop()
+
+
+class HubEntities:
+    """The matrix entity, and the helpers it owns, of one platform set up on a hub."""
+
+    __slots__ = ("matrix_entity", "auto_router", "fades", "announcer")
+
+    def __init__(self, matrix_entity, auto_router, fades, announcer):
+        self.matrix_entity = matrix_entity
+        self.auto_router = auto_router
+        self.fades = fades
+        self.announcer = announcer
+
+
+class MatrixHub:
+    """Owns the single connection to one matrix, and the dispatcher shared by all of its entities.
+
+    The acmax24 library maintains the websocket from its own transport thread, and reconnects on
+    its own if the socket drops.  The hub watches the connection from the event loop, reports its
+    health, and restarts the transport (with jittered exponential backoff) if the thread has died.
+    After a reconnect it resyncs: the matrix state is fetched again and diffed against the
+    dispatcher's snapshot, so only the entities which drifted during the outage are written.
+
+    The hub outlives the entities, so reloading them (e.g. after changing options) reuses the live
+    connection and state rather than reconnecting.
+    """
+
+    def __init__(self, hass: HomeAssistant, hostname: str, coalesce_window: float = 0):
+        self._hass = hass
+        self.hostname = hostname
+        self.matrix = ACMax24(hostname, self._async_notify)
+        self.dispatcher = MatrixDispatcher(hass, self.matrix, coalesce_window)
+        self._started = False
+        self._topology = TopologyStore(hass, f"{DOMAIN}.topology.{hostname}")
+        self.input_ids = None
+        self.output_ids = None
+        self.sources = None
+        self.startup = {}
+        self.started_at = None
+        self.label_fetches = LatencyStats()
+        # The entities of each platform set up on this hub (YAML and/or config entry), newest last
+        self._entities = []
+        self._setup_lock = asyncio.Lock()
+        self._unsub_check = None
+        self._unsub_restart = None
+        self._socket = None
+        self._restart_attempts = 0
+        self._resync_task = None
+
+        self.connected = False
+        self.disconnects = 0
+        self.reconnects = 0
+        self.restarts = 0
+        self.last_connected = None
+        self.last_disconnected = None
+        # Outage durations, and the time taken to resync after each one, in seconds
+        self.outages = LatencyStats()
+        self.resyncs = LatencyStats()
+        self.last_resync = None
+
+    async def _async_notify(self):
+        # Called from the acmax24 transport thread; the dispatcher hops back onto the event loop
+        if transport_socket(self.matrix) is not self._socket:
+            # The first message on a new connection, so note it before this message is dispatched
+            self._hass.loop.call_soon_threadsafe(self._async_update_connection)
+        self.dispatcher.notify()
+
+    async def async_start(self):
+        """Start the connection, unless it's already running for another platform/entry."""
+        if self._started:
+            return
+        LOG.info(f"Starting connection to matrix at {self.hostname}")
+        await self.matrix.start()
+        self._started = True
+        self.started_at = time.monotonic()
+        self._unsub_check = async_track_time_interval(
+            self._hass, self._async_check, HEALTH_CHECK_INTERVAL
+        )
+        self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_handle_stop)
+
+    @callback
+    def async_register_entities(self, matrix_entity, auto_router, fades, announcer):
+        """Note the entities of a platform for diagnostics; returns a callback to forget them.
+
+        Each platform's entities are kept separately, so unloading one leaves another's in place.
+        """
+        entities = HubEntities(matrix_entity, auto_router, fades, announcer)
+        self._entities.append(entities)
+
+        @callback
+        def _async_unregister():
+            self._entities.remove(entities)
+
+        return _async_unregister
+
+    def _newest(self, name: str):
+        return getattr(self._entities[-1], name) if self._entities else None
+
+    @property
+    def matrix_entity(self):
+        return self._newest("matrix_entity")
+
+    @property
+    def auto_router(self):
+        return self._newest("auto_router")
+
+    @property
+    def fades(self):
+        return self._newest("fades")
+
+    @property
+    def announcer(self):
+        return self._newest("announcer")
+
+    async def async_refresh_labels(self) -> bool:
+        """Fetch the input/output labels, timing how long the HTTP API takes to answer."""
+        started = time.monotonic()
+        fetched = await async_update_labels(self._hass, self.matrix, self.hostname)
+        if fetched:
+            self.label_fetches.record(time.monotonic() - started)
+        else:
+            self.label_fetches.timeouts += 1
+        return fetched
+
+    async def async_setup(self) -> bool:
+        """Connect, and determine which inputs/outputs are enabled; False if the matrix isn't ready.
+
+        If the topology was cached on a previous run, this returns straight away, and the live state
+        is fetched in the background.  Otherwise it waits (briefly) for the matrix to answer.
+        """
+        # The YAML platform and a config entry for the same host may be set up at the same time;
+        # the lock makes the second wait for the first, rather than starting the connection twice
+        async with self._setup_lock:
+            if self.output_ids is not None:
+                return True
+            return await self._async_setup()
+
+    async def _async_setup(self) -> bool:
+        started = time.monotonic()
+        await self.async_start()
+        cached = await self._topology.async_load()
+        if cached:
+            input_labels, output_labels = cached
+            apply_labels(self.matrix, input_labels, output_labels)
+            self._async_set_topology(sorted(input_labels), sorted(output_labels))
+            LOG.info(f"Using cached topology for matrix at {self.hostname} while connecting")
+            self._hass.async_create_background_task(
+                self._async_hydrate(started), f"{DOMAIN} hydrate {self.hostname}"
+            )
+            return True
+
+        # First run, so there's nothing to create the entities from until the matrix answers
+        await self.async_refresh_labels()
+        LOG.info("Initial update complete")
+        if not await self.matrix.wait_for_initial_state(5):
+            LOG.warn("Initial state not available within timeout, not ready to start platform")
+            return False
+
+        self._async_set_topology(
+            sorted(i.index for i in self.matrix.get_enabled_inputs()),
+            sorted(o.index for o in self.matrix.get_enabled_outputs()),
+        )
+        self._async_set_hydrated(started)
+        await self._topology.async_save(self.matrix)
+        return True
+
+    async def _async_hydrate(self, started):
+        """Wait for the matrix to answer, then bring the entities created from the cache up to date."""
+        labels_fetched = False
+        while True:
+            labels_fetched = labels_fetched or await self.async_refresh_labels()
+            if not labels_fetched:
+                await asyncio.sleep(HYDRATE_TIMEOUT)
+            elif await self.matrix.wait_for_initial_state(HYDRATE_TIMEOUT):
+                break
+            LOG.warning(f"Initial state not yet available from matrix at {self.hostname}, still waiting")
+
+        enabled_outputs = sorted(o.index for o in self.matrix.get_enabled_outputs())
+        if enabled_outputs != self.output_ids:
+            LOG.warning(
+                f"Enabled outputs of matrix at {self.hostname} changed from {self.output_ids} to "
+                f"{enabled_outputs}; reload the integration to pick up the change"
+            )
+        self._async_set_hydrated(started)
+        await self._topology.async_save(self.matrix)
+
+    @callback
+    def _async_set_topology(self, input_ids, output_ids):
+        self.input_ids = input_ids
+        self.output_ids = output_ids
+        self.sources = SourceRegistry(self.matrix, input_ids)
+        # Registered before any entity's listener, so entities see the refreshed sources
+        self.dispatcher.async_add_listener(LABELS, self.sources.async_refresh)
+
+    @callback
+    def _async_set_hydrated(self, started):
+        self.startup["hydrated"] = round(time.monotonic() - started, 3)
+        LOG.info(f"Matrix at {self.hostname} hydrated after {self.startup['hydrated']}s")
+        self.dispatcher.async_set_ready()
+
+    @callback
+    def _async_handle_stop(self, event):
+        self.async_stop()
+
+    @callback
+    def async_stop(self):
+        if self._unsub_check:
+            self._unsub_check()
+            self._unsub_check = None
+        if self._unsub_restart:
+            self._unsub_restart()
+            self._unsub_restart = None
+        if self._resync_task:
+            self._resync_task.cancel()
+            self._resync_task = None
+        # The library can't stop its transport thread, so just stop dispatching its notifications
+        self.dispatcher.ready = False
+        self.dispatcher.async_shutdown()
+
+    @property
+    def health(self) -> dict:
+        return {
+            "connected": self.connected,
+            "disconnects": self.disconnects,
+            "reconnects": self.reconnects,
+            "transport_restarts": self.restarts,
+            "last_connected": self.last_connected,
+            "last_disconnected": self.last_disconnected,
+            "outages": self.outages.as_dict(),
+            "resyncs": self.resyncs.as_dict(),
+            "last_resync": self.last_resync,
+        }
+
+    @callback
+    def _async_update_connection(self):
+        """Track connection state transitions, and resync after a reconnect."""
+        socket = transport_socket(self.matrix)
+        connected = socket is not None and socket.open
+
+        if connected and (not self.connected or socket is not self._socket):
+            if self.last_connected is not None:
+                now = time.time()
+                if self.connected:
+                    # Dropped and re-established between two checks, so the outage wasn't timed
+                    self.disconnects += 1
+                    self.last_disconnected = now
+                    outage = None
+                else:
+                    outage = now - self.last_disconnected
+                    self.outages.record(outage)
+                self.reconnects += 1
+                LOG.info(f"Reconnected to matrix at {self.hostname}")
+                self._async_start_resync(outage)
+            self.last_connected = time.time()
+            self._restart_attempts = 0
+        elif self.connected and not connected:
+            self.disconnects += 1
+            self.last_disconnected = time.time()
+            LOG.warning(f"Lost connection to matrix at {self.hostname}")
+
+        changed = connected != self.connected
+        self.connected = connected
+        self._socket = socket
+        if changed:
+            self.dispatcher.async_wake(CONNECTION)
+
+    @callback
+    def _async_start_resync(self, outage):
+        # Before hydration there's no snapshot to diff against, and hydration fetches everything
+        if not self.dispatcher.ready or (self._resync_task and not self._resync_task.done()):
+            return
+        # Counted from here, as the first message on the new connection is about to be dispatched
+        counts = (time.monotonic(), self.dispatcher.notifications, self.dispatcher.dispatched_updates)
+        self._resync_task = self._hass.async_create_background_task(
+            self._async_resync(outage, *counts), f"{DOMAIN} resync {self.hostname}"
+        )
+
+    async def _async_resync(self, outage, started, notifications, updates):
+        """Fetch the matrix state again after an outage, and dispatch only what changed.
+
+        Notifications are diffed against the dispatcher's snapshot as usual, so an entity is only
+        written if its output or input drifted while the connection was down.
+        """
+
+        # Labels aren't pushed, so they may also have changed while disconnected
+        labels_fetched = await self.async_refresh_labels()
+        # The library asks for the configuration on connecting; ask again, and wait for the marker
+        # it sets at the end of the configuration (if this version of the library has one)
+        marked = set_private(self.matrix, "_initial_io_config_received", False)
+        transport = get_transport(self.matrix)
+        if transport is not None:
+            await transport.refresh()
+            await transport.refresh_signal_status()
+        deadline = time.monotonic() + RESYNC_TIMEOUT
+        while True:
+            # Sleeping first lets the notifications queued by the transport thread reach the loop
+            await asyncio.sleep(0.05)
+            complete = not marked or get_private(self.matrix, "_initial_io_config_received")
+            if complete or time.monotonic() > deadline:
+                break
+        if marked:
+            set_private(self.matrix, "_initial_io_config_received", True)
+
+        # The library drops its notifications until the marker is set again, so the re-sent state
+        # has to be diffed here, whether or not the labels could be fetched
+        self.dispatcher.async_flush()
+        self.dispatcher.async_process()
+
+        duration = time.monotonic() - started
+        if complete:
+            self.resyncs.record(duration)
+        else:
+            self.resyncs.timeouts += 1
+        self.last_resync = {
+            "outage": round(outage, 3) if outage is not None else None,
+            "duration": round(duration, 3),
+            "complete": complete,
+            "labels_fetched": labels_fetched,
+            "notifications": self.dispatcher.notifications - notifications,
+            "updated_entities": self.dispatcher.dispatched_updates - updates,
+        }
+        LOG.info(f"Resynced with matrix at {self.hostname}: {self.last_resync}")
+
+    async def _async_check(self, now=None):
+        """Update the connection state, and restart a dead transport thread."""
+        self._async_update_connection()
+
+        thread = get_private(get_transport(self.matrix), "_thread")
+        if thread is None or thread.is_alive() or self._unsub_restart:
+            return
+        backoff = min(RESTART_BACKOFF_MIN * 2**self._restart_attempts, RESTART_BACKOFF_MAX)
+        delay = random.uniform(backoff / 2, backoff)
+        self._restart_attempts += 1
+        LOG.warning(
+            f"Transport for matrix at {self.hostname} has stopped; restarting in {delay:.1f}s"
+        )
+        self._unsub_restart = async_call_later(self._hass, delay, self._async_restart)
+
+    async def _async_restart(self, now=None):
+        self._unsub_restart = None
+        self.restarts += 1
+        await self.matrix.start()
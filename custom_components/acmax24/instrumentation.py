@@ -0,0 +1,46 @@
+"""Latency histograms for the diagnostics of an AC-MAX-24."""
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets, in milliseconds; the last bucket is unbounded
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram:
+    """Counts of latencies (recorded in seconds) in fixed millisecond buckets."""
+
+    __slots__ = ("counts", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, latency: float):
+        ms = latency * 1000
+        self.counts[bisect_left(BUCKETS, ms)] += 1
+        self.count += 1
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, pct: float):
+        """The upper bound (in ms) of the bucket holding the given percentile, or None if empty."""
+        if not self.count:
+            return None
+        target = self.count * pct / 100
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, round(self.max, 1))
+        return round(self.max, 1)
+
+    def as_dict(self) -> dict:
+        buckets = {f"<={bound}ms": count for bound, count in zip(BUCKETS, self.counts)}
+        buckets[f">{BUCKETS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": round(self.max, 1),
+            "buckets": buckets,
+        }
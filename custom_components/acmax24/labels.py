@@ -0,0 +1,51 @@
+"""Async retrieval of AC-MAX-24 input/output labels."""
+import asyncio
+import json
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .compat import set_private
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+FETCH_TIMEOUT = 10
+
+
+async def async_update_labels(hass: HomeAssistant, matrix, hostname: str) -> bool:
+    """Fetch the port aliases over the "cmd" HTTP API, and apply them to the matrix.
+
+    This mirrors ACMax24.update(), but runs on the event loop using the shared aiohttp
+    session instead of blocking an executor thread with requests.
+    """
+    session = async_get_clientsession(hass)
+    try:
+        async with asyncio.timeout(FETCH_TIMEOUT):
+            resp = await session.get(f"http://{hostname}/do?cmd=status")
+            if resp.status != 200:
+                LOG.warning(
+                    f"Failed to fetch status from matrix {hostname}, got response code {resp.status}"
+                )
+                return False
+            body = await resp.json(content_type=None)
+        portalias = json.loads(body["info"]["portalias"])
+    except Exception as e:
+        LOG.warning(f"Failed to fetch status from matrix {hostname}, got exception: {e}")
+        return False
+
+    apply_labels(
+        matrix,
+        {int(a["port"].strip("IN ")): a["id"] for a in portalias["inputsID"]},
+        {int(a["port"].strip("OUT ")): a["id"] for a in portalias["outputsAudioID"]},
+    )
+    set_private(matrix, "_initial_labels_fetched", True)
+    return True
+
+
+def apply_labels(matrix, input_labels: dict, output_labels: dict):
+    """Set input/output labels on the matrix; the library only exposes these as read-only properties."""
+    for idx, label in input_labels.items():
+        set_private(matrix.get_input(idx), "_label", label)
+    for idx, label in output_labels.items():
+        set_private(matrix.get_output(idx), "_label", label)
@@ -1,46 +1,94 @@
 """Home Assistant Media Player for AVPro Edge AC-MAX-24 Audio Matrix"""
 
-import logging
 import asyncio
+import logging
+import time
 
 import voluptuous as vol
 from homeassistant.components.media_player import PLATFORM_SCHEMA, MediaPlayerEntity
 from homeassistant.components.media_player.const import MediaPlayerEntityFeature
 
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     CONF_ENTITY_NAMESPACE,
     CONF_NAME,
     CONF_HOST,
+    EVENT_HOMEASSISTANT_STOP,
     STATE_ON,
     STATE_UNKNOWN,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import PlatformNotReady
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers import discovery, entity_platform, service
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers import discovery, entity_platform
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.util import dt as dt_util
-from acmax24 import ACMax24
-from ratelimit import limits
 
 from .const import (
+    ATTR_DURATION,
+    ATTR_SCENE,
+    ATTR_SOURCE,
+    ATTR_TIMEOUT,
+    ATTR_VOLUME_LEVEL,
+    ATTR_ZONES,
+    CONF_AUTO_ROUTES,
+    CONF_COALESCE_WINDOW,
+    CONF_DIAGNOSTICS,
+    CONF_LABEL_REFRESH_INTERVAL,
+    CONF_MAX_INFLIGHT,
+    CONF_MAX_SCENES,
+    CONF_MIRROR_ATTRIBUTES,
+    CONF_SIGNAL_OFF_DELAY,
+    CONF_SIGNAL_ON_DELAY,
+    CONF_SOURCE_ENTITY_MAP,
+    DEFAULT_ANNOUNCE_TIMEOUT,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_LABEL_REFRESH_INTERVAL,
+    DEFAULT_MAX_INFLIGHT,
+    DEFAULT_MAX_SCENES,
+    DEFAULT_NAME,
+    DEFAULT_NAMESPACE,
+    DEFAULT_SCENE,
+    DEFAULT_SIGNAL_OFF_DELAY,
+    DEFAULT_SIGNAL_ON_DELAY,
     DOMAIN,
+    HIGH_CHURN_ATTRIBUTES,
+    MIRROR_ATTRIBUTES,
+    OPTIMISTIC_TIMEOUT,
+    SERVICE_ANNOUNCE,
+    SERVICE_FADE,
+    SERVICE_REFRESH,
     SERVICE_RESTORE,
     SERVICE_SNAPSHOT,
 )
+from .announcements import Announcer
+from .commands import CommandBatch, OutputCommandQueue
+from .dispatcher import LABELS, OUTPUTS, output_key, snapshot_output
+from .fades import FadeEngine
+from .groups import ZoneGroups
+from .hub import CONNECTION, async_get_hub
+from .optimistic import LatencyStats, OptimisticState
+from .scenes import SceneStore
+from .routing import AUTO_ROUTES_SCHEMA, AutoRouter
+from .source_tracker import SourceEntityTracker
 
 LOG: logging.Logger = logging.getLogger(__package__)
 
-CONF_SOURCE_ENTITY_MAP = "source_entity_map"
+SUPPORTED_AMP_FEATURES = (
+    MediaPlayerEntityFeature.SELECT_SOURCE
+    | MediaPlayerEntityFeature.VOLUME_MUTE
+    | MediaPlayerEntityFeature.VOLUME_SET
+)
 
-SUPPORTED_AMP_FEATURES = MediaPlayerEntityFeature.SELECT_SOURCE
+VOLUME_STEP = 5
 
 SUPPORTED_ZONE_FEATURES = (
     MediaPlayerEntityFeature.SELECT_SOURCE
     | MediaPlayerEntityFeature.VOLUME_MUTE
     | MediaPlayerEntityFeature.VOLUME_SET
     | MediaPlayerEntityFeature.VOLUME_STEP
+    | MediaPlayerEntityFeature.GROUPING
 )
 
 TRANSPORT_FEATURES = (
@@ -52,169 +100,386 @@ TRANSPORT_FEATURES = (
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
-        vol.Optional(CONF_NAME, default="AVPro Edge AC-MAX-24"): cv.string,
+        vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
         vol.Required(CONF_HOST): cv.string,
-        vol.Optional(CONF_ENTITY_NAMESPACE, default="acmax24"): cv.string,
+        vol.Optional(CONF_ENTITY_NAMESPACE, default=DEFAULT_NAMESPACE): cv.string,
         vol.Optional(CONF_SOURCE_ENTITY_MAP, default={}): {cv.string: cv.entity_id},
+        vol.Optional(CONF_MIRROR_ATTRIBUTES, default=list(MIRROR_ATTRIBUTES)): vol.All(
+            cv.ensure_list, [vol.In(MIRROR_ATTRIBUTES)]
+        ),
+        vol.Optional(CONF_COALESCE_WINDOW, default=DEFAULT_COALESCE_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=2000)
+        ),
+        vol.Optional(
+            CONF_LABEL_REFRESH_INTERVAL, default=DEFAULT_LABEL_REFRESH_INTERVAL
+        ): cv.time_period,
+        vol.Optional(CONF_MAX_SCENES, default=DEFAULT_MAX_SCENES): cv.positive_int,
+        vol.Optional(CONF_MAX_INFLIGHT, default=DEFAULT_MAX_INFLIGHT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=4)
+        ),
+        vol.Optional(CONF_SIGNAL_ON_DELAY, default=DEFAULT_SIGNAL_ON_DELAY): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=300)
+        ),
+        vol.Optional(CONF_SIGNAL_OFF_DELAY, default=DEFAULT_SIGNAL_OFF_DELAY): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=300)
+        ),
+        vol.Optional(CONF_AUTO_ROUTES, default=[]): AUTO_ROUTES_SCHEMA,
+        vol.Optional(CONF_DIAGNOSTICS, default=False): cv.boolean,
     }
 )
 
 # schema for media player service calls
 SERVICE_CALL_SCHEMA = vol.Schema({ATTR_ENTITY_ID: cv.comp_entity_ids})
 
-MINUTES = 60
+SCENE_SERVICE_SCHEMA = {
+    vol.Optional(ATTR_SCENE, default=DEFAULT_SCENE): cv.string,
+    vol.Optional(ATTR_ZONES): cv.entity_ids,
+}
+
+# Zones fade to volume_level; the matrix entity fades its zones to volume_level, or to the volumes
+# saved in a scene
+FADE_SERVICE_SCHEMA = {
+    vol.Required(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+    vol.Optional(ATTR_VOLUME_LEVEL): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+    vol.Optional(ATTR_SCENE): cv.string,
+    vol.Optional(ATTR_ZONES): cv.entity_ids,
+}
+
+ANNOUNCE_SERVICE_SCHEMA = {
+    vol.Required(ATTR_SOURCE): cv.string,
+    vol.Optional(ATTR_ZONES): cv.entity_ids,
+    vol.Optional(ATTR_VOLUME_LEVEL): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+    vol.Optional(ATTR_TIMEOUT, default=DEFAULT_ANNOUNCE_TIMEOUT): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=3600)
+    ),
+}
 
 async def async_setup_platform(
     hass: HomeAssistant, config, async_add_entities, discovery_info=None
 ):
-    """Set up the AVPro Edge Audio Matrix platform."""
+    """Set up the AVPro Edge Audio Matrix platform from YAML."""
     hostname = config.get(CONF_HOST)
     namespace = config.get(CONF_ENTITY_NAMESPACE)
-    source_entity_map = config.get(CONF_SOURCE_ENTITY_MAP, {})
-    entities = []
-    zone_players = []
-    matrix = None
-    matrix_entity = None
+    matrix_name = config.get(CONF_NAME)
 
     LOG.info(f"Configuring acmax24 plugin for {namespace}, hass={hass}")
 
-    async def notify_callback():
-        LOG.debug(f"Received notify callback.  matrix_entity={matrix_entity}")
-        if matrix_entity:
-            matrix_entity.schedule_update_ha_state()
-        for zp in zone_players:
-            zp.schedule_update_ha_state()
-        for sensor in hass.data.get(DOMAIN, {}).get("signal_sensors", []):
-            sensor.notify()
+    setup_started = time.monotonic()
+    hub = await _async_setup_hub(hass, config)
+    async_unload = _async_add_matrix_entities(
+        hass, hub, config, async_add_entities, setup_started
+    )
 
-    try:
-        LOG.info("Setting up %s platform", namespace)
-        matrix = ACMax24(hostname, notify_callback)
-        LOG.debug("Matrix created, about to start")
+    # A plain lambda would be run in the executor; the unload must run on the event loop
+    @callback
+    def _async_handle_stop(event):
+        async_unload()
 
-        await matrix.start()
-        LOG.debug("Started")
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_handle_stop)
+
+    hass.async_create_task(
+        discovery.async_load_platform(
+            hass,
+            "binary_sensor",
+            DOMAIN,
+            {
+                "namespace": namespace,
+                "matrix_name": matrix_name,
+                "host": hostname,
+                "inputs": hub.input_ids,
+                CONF_SIGNAL_ON_DELAY: config.get(CONF_SIGNAL_ON_DELAY),
+                CONF_SIGNAL_OFF_DELAY: config.get(CONF_SIGNAL_OFF_DELAY),
+            },
+            config,
+        )
+    )
+    if config.get(CONF_DIAGNOSTICS):
+        hass.async_create_task(
+            discovery.async_load_platform(
+                hass,
+                "sensor",
+                DOMAIN,
+                {"namespace": namespace, "matrix_name": matrix_name, "host": hostname},
+                config,
+            )
+        )
 
-        await hass.async_add_executor_job(matrix.update)
-        LOG.info("Initial update complete")
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
+    """Set up the AVPro Edge Audio Matrix platform from a config entry.
+
+    The hub (and its connection) has already been set up by the integration, and survives reloads
+    of the entry, so this only has to create the entities.
+    """
+    setup_started = time.monotonic()
+    config = entry_config(entry)
+    hub = await _async_setup_hub(hass, config)
+    entry.async_on_unload(
+        _async_add_matrix_entities(hass, hub, config, async_add_entities, setup_started)
+    )
+
+
+def entry_config(entry: ConfigEntry) -> dict:
+    """Merge a config entry's data and options into the same shape as the YAML platform config."""
+    # The label refresh interval is stored as plain seconds, which cv.time_period accepts
+    return PLATFORM_SCHEMA({"platform": DOMAIN, **entry.data, **entry.options})
+
+
+async def _async_setup_hub(hass: HomeAssistant, config):
+    """Return the hub for the configured host, once it knows which inputs/outputs are enabled."""
+    hostname = config.get(CONF_HOST)
+
+    # One connection per matrix, shared by every platform configured for the same host
+    hub = async_get_hub(hass, hostname, config.get(CONF_COALESCE_WINDOW, 0) / 1000)
+    try:
+        LOG.info("Setting up %s platform", config.get(CONF_ENTITY_NAMESPACE))
+        ready = await hub.async_setup()
+        LOG.debug("Started")
     except Exception as e:
         LOG.error(f"Error initializing ACMax24 matrix at {hostname} {e}")
-        raise PlatformNotReady
-
-    ready = await matrix.wait_for_initial_state(5)
+        raise PlatformNotReady from e
     if not ready:
-        LOG.warn("Initial state not available within timeout, not ready to start platform")
         raise PlatformNotReady
+    return hub
 
-    sources = {
-        source.index: source.label for source in  matrix.get_enabled_inputs()
-    }
 
+@callback
+def _async_add_matrix_entities(hass: HomeAssistant, hub, config, async_add_entities, setup_started):
+    """Create the zone and matrix entities for a hub, start auto-routing, and register the services.
+
+    Returns a callback, which the caller must call when the entities are removed.
+    """
+    namespace = config.get(CONF_ENTITY_NAMESPACE)
     matrix_name = config.get(CONF_NAME)
+    source_entity_map = config.get(CONF_SOURCE_ENTITY_MAP, {})
+    matrix = hub.matrix
+    entities = []
+    zone_players = []
+
+    source_tracker = SourceEntityTracker(hass, source_entity_map)
+    source_tracker.async_start()
+    groups = ZoneGroups()
+    fades = FadeEngine(hass)
+
+    sources = hub.sources
 
     LOG.info(
-        f"Creating zone media players for {namespace} '{matrix_name}'; sources={sources}"
+        f"Creating zone media players for {namespace} '{matrix_name}'; sources={sources.source_list}"
     )
     if source_entity_map:
         LOG.info(f"Source entity map configured: {source_entity_map}")
 
-    for output in matrix.get_enabled_outputs():
+    for idx in hub.output_ids:
+        output = matrix.get_output(idx)
         LOG.debug("Adding ZoneMediaPlayer for %s", output)
-        zp = ZoneMediaPlayer(namespace, matrix_name, matrix, sources, output, source_entity_map)
+        zp = ZoneMediaPlayer(
+            namespace,
+            matrix_name,
+            matrix,
+            hub.dispatcher,
+            sources,
+            output,
+            source_tracker,
+            groups,
+            fades,
+            config.get(CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT),
+            config.get(CONF_MIRROR_ATTRIBUTES, MIRROR_ATTRIBUTES),
+        )
         entities.append(zp)
         zone_players.append(zp)
 
+    # Announcements finish once their input has been silent for as long as a signal sensor waits
+    announcer = Announcer(
+        hass, hub, fades, config.get(CONF_SIGNAL_OFF_DELAY, DEFAULT_SIGNAL_OFF_DELAY)
+    )
+
     # Add the master Media Player for the main control unit, with references to all the zones
-    matrix_entity = ACMax24Entity(hass, namespace, matrix_name, matrix, sources, entities)
+    matrix_entity = ACMax24Entity(
+        hass,
+        namespace,
+        matrix_name,
+        hub,
+        sources,
+        zone_players,
+        fades,
+        announcer,
+        config.get(CONF_LABEL_REFRESH_INTERVAL, DEFAULT_LABEL_REFRESH_INTERVAL),
+        config.get(CONF_MAX_SCENES, DEFAULT_MAX_SCENES),
+    )
     entities.append(matrix_entity)
 
-    async_add_entities(entities, True)
+    # All state is pushed from the matrix, so there is nothing to fetch before adding the entities
+    async_add_entities(entities)
+    matrix_entity.async_record_startup("entities_ready", time.monotonic() - setup_started)
 
-    hass.async_create_task(
-        discovery.async_load_platform(
-            hass,
-            "binary_sensor",
-            DOMAIN,
-            {"namespace": namespace, "matrix_name": matrix_name, "matrix": matrix},
-            config,
-        )
-    )
+    zones = {zone.zone_id: zone for zone in zone_players}
+    auto_router = AutoRouter(hass, hub, config.get(CONF_AUTO_ROUTES, []), fades, zones)
+    auto_router.async_start()
+
+    # Latency histograms are only collected while the diagnostic sensors are enabled
+    hub.dispatcher.async_set_instrumentation(config.get(CONF_DIAGNOSTICS, False))
+    unregister = hub.async_register_entities(matrix_entity, auto_router, fades, announcer)
 
-    # setup the service calls
+    # setup the service calls; entity services are shared by every acmax24 platform, so calls
+    # reach the matrix they target when more than one is configured
     platform = entity_platform.current_platform.get()
+    for service_call, schema in (
+        (SERVICE_SNAPSHOT, SCENE_SERVICE_SCHEMA),
+        (SERVICE_RESTORE, SCENE_SERVICE_SCHEMA),
+        (SERVICE_REFRESH, {}),
+        (SERVICE_FADE, FADE_SERVICE_SCHEMA),
+        (SERVICE_ANNOUNCE, ANNOUNCE_SERVICE_SCHEMA),
+    ):
+        platform.async_register_entity_service(
+            service_call, schema, async_service_call_dispatcher
+        )
 
-    @service.verify_domain_control(DOMAIN)
-    async def async_service_call_dispatcher(service_call):
-        entities = await platform.async_extract_from_service(service_call)
-        if not entities:
-            return
+    @callback
+    def async_unload():
+        auto_router.async_stop()
+        announcer.async_stop()
+        fades.async_stop()
+        source_tracker.async_stop()
+        unregister()
 
-        for entity in entities:
-            # TODO: Check that I only receive this for the main entity; ignore the rest?
-            LOG.info(
-                f"Received service call of type {service_call.service} for {entity}"
-            )
+    return async_unload
 
-            if not isinstance(entity, ACMax24Entity):
-                LOG.error(f"ignoring service call for {entity}")
-                continue
 
-            # If we get here, it should definitely be an ACMax24 entity, so we cna call
-            if service_call.service == SERVICE_SNAPSHOT:
-                await entity.snapshot()
-            elif service_call.service == SERVICE_RESTORE:
-                await entity.restore()
+def encode_routing(output_idx, output) -> str:
+    """One zone of the matrix entity's routing attribute: output:input:volume, with m if muted."""
+    return f"{output_idx}:{output.input_channel}:{output.volume}{'m' if output.muted else ''}"
 
 
-    # register the save/restore snapshot services
-    for service_call in (SERVICE_SNAPSHOT, SERVICE_RESTORE):
-        hass.services.async_register(
-            DOMAIN,
-            service_call,
-            async_service_call_dispatcher,
-            schema=cv.make_entity_service_schema({}),
+async def async_service_call_dispatcher(entity, service_call):
+    """Dispatch an acmax24 service call to the matrix entity (or, for fades, the zone) it targets."""
+    LOG.info(f"Received service call of type {service_call.service} for {entity}")
+
+    if service_call.service == SERVICE_FADE:
+        await entity.async_fade(
+            service_call.data[ATTR_DURATION],
+            service_call.data.get(ATTR_VOLUME_LEVEL),
+            service_call.data.get(ATTR_SCENE),
+            service_call.data.get(ATTR_ZONES),
+        )
+        return
+
+    if not isinstance(entity, ACMax24Entity):
+        LOG.error(f"ignoring service call for {entity}")
+        return
+
+    scene = service_call.data.get(ATTR_SCENE, DEFAULT_SCENE)
+    zones = service_call.data.get(ATTR_ZONES)
+    if service_call.service == SERVICE_SNAPSHOT:
+        await entity.snapshot(scene, zones)
+    elif service_call.service == SERVICE_RESTORE:
+        await entity.restore(scene, zones)
+    elif service_call.service == SERVICE_REFRESH:
+        await entity.async_refresh()
+    elif service_call.service == SERVICE_ANNOUNCE:
+        await entity.async_announce(
+            service_call.data[ATTR_SOURCE],
+            zones,
+            service_call.data.get(ATTR_VOLUME_LEVEL),
+            service_call.data[ATTR_TIMEOUT],
         )
 
 
 class ACMax24Entity(MediaPlayerEntity):
     """Representation of the entire ACMax24 matrix."""
 
-    def __init__(self, hass, namespace, name, matrix, sources, zone_players):
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        hass,
+        namespace,
+        name,
+        hub,
+        sources,
+        zone_players,
+        fades,
+        announcer,
+        refresh_interval=DEFAULT_LABEL_REFRESH_INTERVAL,
+        max_scenes=DEFAULT_MAX_SCENES,
+    ):
         self._hass = hass
         self._name = name
-        self._matrix = matrix
+        self._hub = hub
+        self._hostname = hub.hostname
+        self._refresh_interval = refresh_interval
+        self._matrix = hub.matrix
+        self._dispatcher = hub.dispatcher
         self._zone_players = zone_players
-
-        # TODO: Refactor the code that depends on these mappings; the acmax24 library can handle all this directly.
-        self._source_id_to_name = sources  # [source_id]   -> source name
-        self._source_name_to_id = {
-            v: k for k, v in sources.items()
-        }  # [source name] -> source_id
-
-        # sort list of source names
-        self._source_names = sorted(
-            self._source_name_to_id.keys(), key=lambda v: self._source_name_to_id[v]
-        )
+        self._fades = fades
+        self._announcer = announcer
+        self._last_restore_duration = None
+        self._last_restore_commands = None
+        self._routing = None
+        self.restore_latency = LatencyStats()
+        self._startup = {}
+
+        # Shared with the zones, and refreshed when the matrix's labels change
+        self._sources = sources
         # TODO: Ideally the source order could be overridden in YAML config (e.g. TV should appear first on list).
         #       Optionally, we could just sort based on the zone number, and let the user physically wire in the
         #       order they want (doesn't work for pre-amp out channel 7/8 on some Xantech)
 
         self._unique_id = f"{DOMAIN}_{namespace}_{name}".lower().replace(" ", "_")
+        self._scenes = SceneStore(hass, f"{DOMAIN}.scenes.{self._unique_id}", max_scenes)
 
-    async def async_update(self):
-        """Retrieve the latest state from the amp."""
-        LOG.debug("async_update scheduling executor job to refresh labels")
-        try:
-            await self.hass.async_add_executor_job(self._matrix.update)
-        except Exception as e:
-            LOG.error("async_update encountered exception %s", e)
-        LOG.debug("async_update completed label refresh")
+    async def async_added_to_hass(self):
+        """Subscribe to label, output and connection changes, and schedule the periodic label refresh."""
+        # Volume and mute are aggregated across all zones, so any output change applies here
+        self.async_on_remove(
+            self._dispatcher.async_add_listener(OUTPUTS, self._async_handle_outputs_update)
+        )
+        for key in (LABELS, CONNECTION):
+            self.async_on_remove(
+                self._dispatcher.async_add_listener(key, self.async_write_ha_state)
+            )
+        # The matrix may have been ready before this entity was added
+        if self._dispatcher.ready:
+            self._async_update_routing()
+
+        async def _async_refresh_interval(now):
+            await self.async_refresh()
+
+        # Labels are the only state which is not pushed by the matrix
+        self.async_on_remove(
+            async_track_time_interval(self.hass, _async_refresh_interval, self._refresh_interval)
+        )
+
+    @callback
+    def _async_handle_outputs_update(self):
+        # OUTPUTS is woken at most once per dispatch pass, so this is once per coalesced batch
+        self._async_update_routing()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_update_routing(self):
+        """Rebuild the routing summary from the state the matrix has confirmed."""
+        self._routing = " ".join(
+            encode_routing(zone.zone_id, self._matrix.get_output(zone.zone_id))
+            for zone in self._zone_players
+        )
+
+    async def async_refresh(self):
+        """Refresh the input/output labels, which are not pushed by the matrix."""
+        LOG.debug(f"Refreshing labels for {self._name}")
+        if await self._hub.async_refresh_labels():
+            # Labels are part of the dispatcher snapshot, so only relabelled entities are woken
+            self._dispatcher.async_process()
+        LOG.debug(f"Completed label refresh for {self._name}")
 
     @property
     def unique_id(self):
         """Return unique ID for this device."""
         return self._unique_id
 
+    @property
+    def zone_players(self):
+        return self._zone_players
+
     @property
     def name(self):
         """Return the amp's name."""
@@ -233,57 +498,199 @@ class ACMax24Entity(MediaPlayerEntity):
     @property
     def source_list(self):
         """List of available input sources."""
-        return self._source_names
+        return self._sources.source_list
+
+    @property
+    def volume_level(self):
+        """Average volume of all zones (0..1)."""
+        levels = [zone.volume_level or 0 for zone in self._zone_players]
+        if not levels:
+            return None
+        return sum(levels) / len(levels)
+
+    @property
+    def is_volume_muted(self):
+        """Boolean if all zones are muted."""
+        return all(zone.is_volume_muted for zone in self._zone_players)
 
     async def async_select_source(self, source):
         """Set input source for all zones."""
-        if source not in self._source_name_to_id:
+        source_id = self._sources.index(source)
+        if source_id is None:
             LOG.warning(
-                f"Selected source '{source}' not valid for {self._name}, ignoring! Sources: {self._source_name_to_id}"
+                f"Selected source '{source}' not valid for {self._name}, ignoring! Sources: {self._sources.source_list}"
             )
             return
 
-        # set the same source for all zones
-        for zone in self._zone_players:
-            await zone.async_select_source(source)
+        LOG.info(f"Switching all zones of {self._name} to source {source_id} ({source})")
+        await self._async_send_to_zones(source=source_id)
+
+    async def async_mute_volume(self, mute):
+        """Mute (true) or unmute (false) all zones."""
+        await self._async_send_to_zones(muted=mute)
+
+    async def async_set_volume_level(self, volume):
+        """Set the volume level of all zones, range 0—1.0"""
+        await self._async_send_to_zones(volume=int(volume * 100))
+
+    async def _async_send_to_zones(self, **change):
+        # Through each zone's own queue, so the change replaces anything still pending for the zone
+        # (rather than being overwritten by it), and the zones show it until the matrix confirms it
+        await asyncio.gather(*(zone.async_queue_change(**change) for zone in self._zone_players))
 
     @property
     def icon(self):
         return "mdi:speaker"
 
-    async def snapshot(self):
-        """Save matrix current state."""
-        LOG.info(f"Saving state snapshot for {self.name}")
-        self._status_snapshot = await self._matrix.save_state()
-        LOG.info(f"Saved state snapshot for {self.name}")
-
-    async def restore(self):
-        """Restore matrix saved state."""
-        if self._status_snapshot:
-            ## FIXME: This is an async call; how do we make that work?
-            LOG.info(f"Restoring previous state for {self.name}")
-            await self._matrix.restore_state(self._status_snapshot)
-            self.async_schedule_update_ha_state(force_refresh=True)
-            LOG.info(f"Restored previous state for {self.name}")
+    @property
+    def available(self):
+        """Unavailable until the matrix's initial state has been received."""
+        return self._dispatcher.ready
+
+    @callback
+    def async_record_startup(self, metric, duration):
+        """Record how long it took to reach a milestone (entities_ready); the hub records hydrated."""
+        self._startup[metric] = round(duration, 3)
+        LOG.info(f"Startup of {self._name} reached {metric} after {duration * 1000:.0f}ms")
+        if self.hass:
+            self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self):
+        """Expose the routing summary, connection health, startup timings, and the last restore."""
+        attrs = {
+            "connected": self._hub.connected,
+            "reconnects": self._hub.reconnects,
+            "routing": self._routing,
+        }
+        startup = {**self._hub.startup, **self._startup}
+        attrs.update({f"startup_{metric}": duration for metric, duration in startup.items()})
+        if self._last_restore_duration is not None:
+            attrs["last_restore_duration"] = round(self._last_restore_duration, 3)
+            attrs["last_restore_commands"] = self._last_restore_commands
+        return attrs
+
+    def _zone_ids(self, zones):
+        """Map zone entity ids to output indexes; None selects every zone."""
+        if zones is None:
+            return [zone.zone_id for zone in self._zone_players]
+        return [zone.zone_id for zone in self._zone_players if zone.entity_id in zones]
+
+    async def snapshot(self, scene=DEFAULT_SCENE, zones=None):
+        """Save the current state of the matrix, or of just the given zones, as a named scene."""
+        LOG.info(f"Saving state snapshot '{scene}' for {self.name}")
+        outputs = {
+            idx: snapshot_output(self._matrix.get_output(idx)) for idx in self._zone_ids(zones)
+        }
+        await self._scenes.async_save_scene(scene, outputs)
+        LOG.info(f"Saved state snapshot '{scene}' of {len(outputs)} zones for {self.name}")
+
+    async def restore(self, scene=DEFAULT_SCENE, zones=None):
+        """Restore a named scene, optionally limited to the given zones."""
+        outputs = await self._scenes.async_get_scene(scene)
+        if outputs:
+            LOG.info(f"Restoring state snapshot '{scene}' for {self.name}")
+            start = time.monotonic()
+            restore_ids = self._zone_ids(zones)
+            self._fades.async_cancel(restore_ids)
+            # Only the settings which differ from the current state are sent, as a single batch.  The
+            # resulting changes are pushed back by the matrix, so no forced refresh is needed.
+            batch = CommandBatch(self._matrix)
+            for output_idx, saved in outputs.items():
+                if output_idx in restore_ids:
+                    batch.restore(output_idx, saved)
+            commands = await batch.async_send()
+
+            self._last_restore_duration = time.monotonic() - start
+            self._last_restore_commands = commands
+            self.restore_latency.record(self._last_restore_duration)
+            self.async_write_ha_state()
+            LOG.info(
+                f"Restored state snapshot '{scene}' for {self.name}; sent {commands} commands "
+                f"in {self._last_restore_duration * 1000:.1f}ms"
+            )
+        else:
+            LOG.warning(
+                f"Restore service called for {self.name}, but no snapshot '{scene}' previously saved."
+            )
+
+    async def async_fade(self, duration, volume_level=None, scene=None, zones=None):
+        """Fade zones (all of them, unless given) to a volume, or to their volumes in a saved scene.
+
+        Returns once every fade has completed, or been cancelled.
+        """
+        zone_ids = self._zone_ids(zones)
+        if scene is not None:
+            outputs = await self._scenes.async_get_scene(scene)
+            if not outputs:
+                LOG.warning(f"Fade called for {self.name}, but no snapshot '{scene}' previously saved.")
+                return
+            targets = {
+                zone: outputs[zone.zone_id].volume
+                for zone in self._zone_players
+                if zone.zone_id in zone_ids
+                and zone.zone_id in outputs
+                and outputs[zone.zone_id].volume >= 0
+            }
+        elif volume_level is not None:
+            targets = {
+                zone: int(volume_level * 100)
+                for zone in self._zone_players
+                if zone.zone_id in zone_ids
+            }
         else:
+            LOG.warning(f"Fade called for {self.name} without a volume_level or scene; ignoring")
+            return
+        LOG.info(f"Fading {len(targets)} zones of {self.name} over {duration}s")
+        await self._fades.async_fade(targets, duration)
+
+    async def async_announce(
+        self, source, zones=None, volume_level=None, timeout=DEFAULT_ANNOUNCE_TIMEOUT
+    ):
+        """Play a source on zones (all of them, unless given) until it goes silent, then put them back."""
+        source_id = self._sources.index(source)
+        if source_id is None:
             LOG.warning(
-                f"Restore service called for {self.name}, but no snapshot previously saved."
+                f"Announcement source '{source}' not valid for {self._name}, ignoring! Sources: {self._sources.source_list}"
             )
+            return
+        volume = int(volume_level * 100) if volume_level is not None else None
+        await self._announcer.async_announce(self._zone_ids(zones), source_id, volume, timeout)
 
 
 
 class ZoneMediaPlayer(MediaPlayerEntity):
     """Representation of a matrix amplifier zone."""
 
-    def __init__(self, namespace, matrix_name, matrix, sources, output, source_entity_map=None):
+    _attr_should_poll = False
+    _unrecorded_attributes = HIGH_CHURN_ATTRIBUTES
+
+    def __init__(
+        self,
+        namespace,
+        matrix_name,
+        matrix,
+        dispatcher,
+        sources,
+        output,
+        source_tracker,
+        groups,
+        fades,
+        max_inflight=DEFAULT_MAX_INFLIGHT,
+        mirror_attributes=MIRROR_ATTRIBUTES,
+    ):
         """Initialize new zone."""
         self._matrix = matrix
+        self._dispatcher = dispatcher
         self._matrix_name = matrix_name
         self._name = output.label
         self._output = output
         # TODO: Rename to output_id
         self._zone_id = output.index
         self._matrix_output = matrix.get_output(output.index)
+        self._commands = OutputCommandQueue(matrix, output.index, max_inflight)
+        self._optimistic = OptimisticState(OPTIMISTIC_TIMEOUT)
+        self._unsub_optimistic = None
 
         self._unique_id = f"{DOMAIN}_{matrix_name}_zone_{output.index}".lower().replace(
             " ", "_"
@@ -292,63 +699,153 @@ class ZoneMediaPlayer(MediaPlayerEntity):
         LOG.info(f"Creating {self.zone_info} media player")
 
         self._status = {}
-        self._status_snapshot = None
 
-        self._source = None # xxx UPDATE THIS # TODO:
-        self._source_id_to_name = sources  # [source_id]   -> source name
-        self._source_name_to_id = {
-            v: k for k, v in sources.items()
-        }  # [source name] -> source_id
+        self._sources = sources
 
-        # sort list of source names
-        self._source_names = sorted(
-            self._source_name_to_id.keys(), key=lambda v: self._source_name_to_id[v]
-        )
+        self._source_tracker = source_tracker
+        self._groups = groups
+        self._fades = fades
+
+        # The source entity attributes mirrored by this zone, and those worth writing its state for
+        self._mirror = frozenset(mirror_attributes)
+        self._watched = tuple(sorted(self._mirror - HIGH_CHURN_ATTRIBUTES))
+        self.suppressed_writes = 0
 
-        # source label -> HA entity_id map (e.g. {"James Matrix": "media_player.james_matrix"})
-        self._source_entity_map = source_entity_map or {}
+        # The resolved source, its mapped entity_id and that entity's state; see _async_update_source
+        self._source_label = None
+        self._source_entity_id = None
+        self._source_state = None
+        self._async_update_source()
 
     async def async_added_to_hass(self):
-        """Subscribe to source entity state changes once added to HA."""
-        if not self._source_entity_map:
+        """Subscribe to matrix and source entity state changes once added to HA."""
+        self.async_on_remove(
+            self._dispatcher.async_add_listener(
+                output_key(self._zone_id), self._async_handle_output_update
+            )
+        )
+        # Source labels come from the inputs, so a relabelled input can change this zone too
+        self.async_on_remove(
+            self._dispatcher.async_add_listener(LABELS, self._async_handle_labels_update)
+        )
+        self.async_on_remove(self._async_cancel_optimistic_timer)
+        self.async_on_remove(self._groups.async_add_zone(self))
+
+        # Source entity updates arrive via the matrix's shared tracker, for the entity we're routed to
+        self._async_update_source()
+        self.async_on_remove(lambda: self._source_tracker.async_set_route(self, None))
+
+    @callback
+    def async_handle_source_state(self, new_state):
+        """Called by the source tracker when the entity this zone is routed to changes state.
+
+        The state is only written if something this zone shows, other than the high-churn
+        attributes, has changed; a playing source updates its media_position constantly.
+        """
+        old_state = self._source_state
+        self._source_state = new_state
+        if (
+            old_state is not None
+            and new_state is not None
+            and old_state.state == new_state.state
+            and all(
+                old_state.attributes.get(attr) == new_state.attributes.get(attr)
+                for attr in self._watched
+            )
+        ):
+            self.suppressed_writes += 1
             return
+        self.async_write_ha_state()
+
+    @callback
+    def _async_handle_output_update(self):
+        """Confirm any optimistic values the matrix has now applied, and write the new state."""
+        self._optimistic.reconcile(self._matrix_output)
+        self._async_update_source()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_handle_labels_update(self):
+        self._async_update_source()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_set_optimistic(self, attr, value, operation):
+        """Show the intended value straight away, rather than waiting for the matrix to confirm it."""
+        if attr == "volume":
+            # Any other volume change takes over from a fade
+            self._fades.async_cancel((self._zone_id,))
+        self._optimistic.set(attr, value, operation)
+        self._async_cancel_optimistic_timer()
+        self._unsub_optimistic = async_call_later(
+            self.hass, OPTIMISTIC_TIMEOUT, self._async_expire_optimistic
+        )
+        self._async_update_source()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_expire_optimistic(self, _now):
+        self._unsub_optimistic = None
+        if self._optimistic.expire():
+            self._async_update_source()
+            self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_optimistic_timer(self):
+        if self._unsub_optimistic:
+            self._unsub_optimistic()
+            self._unsub_optimistic = None
 
-        entity_ids = list(self._source_entity_map.values())
-
-        @callback
-        def _handle_source_state_change(event):
-            changed_entity_id = event.data.get("entity_id")
-            if self._current_source_entity_id() == changed_entity_id:
-                self.async_write_ha_state()
+    @property
+    def command_latency(self):
+        """Command-to-confirmation latency statistics (LatencyStats), per operation."""
+        return self._optimistic.latency
+
+    @callback
+    def _async_update_source(self):
+        """Resolve the current source label, its mapped entity_id and that entity's state.
+
+        This only runs when the routing, labels or source entity change, so that the many properties
+        read on every state write are plain attribute lookups.
+        """
+        input_channel = self._optimistic.get("input_channel", self._matrix_output.input_channel)
+        try:
+            self._source_label = self._matrix.get_input(input_channel).label
+        except IndexError:
+            self._source_label = None
 
-        self.async_on_remove(
-            async_track_state_change_event(self.hass, entity_ids, _handle_source_state_change)
-        )
+        self._source_entity_id = self._source_tracker.entity_for(self._source_label)
+        if self.hass:
+            self._source_tracker.async_set_route(self, self._source_entity_id)
+        if self._source_entity_id and self.hass:
+            self._source_state = self.hass.states.get(self._source_entity_id)
+        else:
+            self._source_state = None
 
     def _current_source_entity_id(self):
         """Return the HA entity_id for the zone's current source, or None if unmapped."""
-        current_source = self.source
-        if current_source is None:
-            return None
-        return self._source_entity_map.get(current_source)
+        return self._source_entity_id
 
     def _source_attr(self, attr):
-        """Return an attribute from the current source entity's state, or None."""
-        entity_id = self._current_source_entity_id()
-        if not entity_id:
-            return None
-        state = self.hass.states.get(entity_id)
-        if not state:
+        """Return a mirrored attribute from the current source entity's state, or None."""
+        if not self._source_state or attr not in self._mirror:
             return None
-        return state.attributes.get(attr)
+        return self._source_state.attributes.get(attr)
+
+    @property
+    def zone_id(self):
+        """Matrix output index for this zone."""
+        return self._zone_id
+
+    @property
+    def available(self):
+        """Unavailable until the matrix's initial state has been received."""
+        return self._dispatcher.ready
 
     @property
     def zone_info(self):
         return f"{self._matrix_name} zone {self._zone_id} ({self._name})"
 
-    async def async_update(self):
-        pass
-
     @property
     def unique_id(self):
         """Return unique ID for this device."""
@@ -362,17 +859,19 @@ class ZoneMediaPlayer(MediaPlayerEntity):
     @property
     def state(self):
         """Return zone state from the mapped source entity, falling back to STATE_ON."""
-        entity_id = self._current_source_entity_id()
-        if entity_id:
-            source_state = self.hass.states.get(entity_id)
-            if source_state:
-                return source_state.state
+        if self._source_state:
+            return self._source_state.state
         return STATE_ON
 
+    @property
+    def matrix_volume(self):
+        """Volume as set on the matrix (0..100, negative if not yet known), or as last requested."""
+        return self._optimistic.get("volume", self._matrix_output.volume)
+
     @property
     def volume_level(self):
         """Volume level of the media player (0..1)."""
-        v = self._matrix_output.volume
+        v = self.matrix_volume
         if v < 1:
             return None
         else:
@@ -381,13 +880,13 @@ class ZoneMediaPlayer(MediaPlayerEntity):
     @property
     def is_volume_muted(self):
         """Boolean if output is currently muted."""
-        return self._matrix_output.muted
+        return self._optimistic.get("muted", self._matrix_output.muted)
 
     @property
     def supported_features(self):
         """Return flag of media commands that are supported."""
         features = SUPPORTED_ZONE_FEATURES
-        if self._current_source_entity_id() is not None:
+        if self._source_entity_id is not None:
             features |= TRANSPORT_FEATURES
         return features
 
@@ -413,7 +912,9 @@ class ZoneMediaPlayer(MediaPlayerEntity):
 
     @property
     def media_position_updated_at(self):
-        val = self._source_attr("media_position_updated_at")
+        if not self._source_state or "media_position" not in self._mirror:
+            return None
+        val = self._source_state.attributes.get("media_position_updated_at")
         if val is None:
             return None
         if hasattr(val, "isoformat"):
@@ -422,81 +923,181 @@ class ZoneMediaPlayer(MediaPlayerEntity):
 
     @property
     def entity_picture(self):
-        entity_id = self._current_source_entity_id()
-        if not entity_id:
-            return None
-        state = self.hass.states.get(entity_id)
-        if not state:
-            return None
-        return state.attributes.get("entity_picture")
+        return self._source_attr("entity_picture")
 
     @property
     def extra_state_attributes(self):
         """Expose source entity id and source volume for dual-volume command routing."""
         attrs = {}
-        entity_id = self._current_source_entity_id()
-        if entity_id:
-            attrs["active_source_entity_id"] = entity_id
-            source_state = self.hass.states.get(entity_id)
-            if source_state:
-                attrs["source_volume_level"] = source_state.attributes.get("volume_level")
+        if self._source_entity_id:
+            attrs["active_source_entity_id"] = self._source_entity_id
+            if self._source_state and "source_volume_level" in self._mirror:
+                attrs["source_volume_level"] = self._source_state.attributes.get("volume_level")
         return attrs
 
+    @property
+    def group_members(self):
+        """Entity ids of the zones grouped with this one, the leader first."""
+        return self._groups.members(self)
+
     @property
     def source(self):
         """Return the current input source of the device."""
-        input = None
-        try:
-            input = self._matrix.get_input(self._matrix_output.input_channel)
-        except IndexError:
-            pass
-
-        if input:
-            return input.label
-        else:
-            return None
+        return self._source_label
 
     @property
     def source_list(self):
         """List of available input sources."""
-        return self._source_names
+        return self._sources.source_list
 
     async def async_select_source(self, source):
         """Set input source."""
-        if source not in self._source_name_to_id:
+        source_id = self._sources.index(source)
+        if source_id is None:
             LOG.warning(
-                f"Selected source '{source}' not valid for {self.zone_info}, ignoring! Sources: {self._source_name_to_id}"
+                f"Selected source '{source}' not valid for {self.zone_info}, ignoring! Sources: {self._sources.source_list}"
             )
             return
 
-        source_id = self._source_name_to_id[source]
         LOG.info(f"Switching {self.zone_info} to source {source_id} ({source})")
-        await self._matrix.change_input_for_output(self._zone_id, source_id)
+        if self._groups.led_by(self):
+            await self._async_group_send(source=source_id)
+            return
+        self._async_set_optimistic("input_channel", source_id, "select_source")
+        await self._commands.async_select_source(source_id)
 
-    # Note: When HA mutates the attributes, it immediately re-reads them -- but typically we haven't seen
-    # the update before it does, so it then takes another refresh cycle before it is observed.  There may be
-    # an element of the HA API I'm misunderstanding, but if not, then one option to address this is to track
-    # when we've sent a command, and not seen an update yet, and then wait briefly in the accessor functions
-    # for an update to arrive, before we return the current state
+    # Note: When HA mutates the attributes, it immediately re-reads them -- typically before the matrix
+    # has pushed the update.  So each command records the intended value, which the accessors return
+    # until the matrix confirms it (or OPTIMISTIC_TIMEOUT passes, and the matrix's value is shown again).
     async def async_mute_volume(self, mute):
         """Mute (true) or unmute (false) media player."""
         LOG.debug(f"Setting mute={mute} for zone {self.zone_info}")
-        await self._matrix.mute_output(self._zone_id, mute)
+        if self._groups.led_by(self):
+            await self._async_group_send(muted=mute)
+            return
+        self._async_set_optimistic("muted", mute, "mute_output")
+        await self._commands.async_mute(mute)
 
+    # Volume commands go through the per-zone queue, so that holding a button or dragging a slider
+    # only sends the net change once the previous command has been written.
     async def async_set_volume_level(self, volume):
         """Set volume level, range 0—1.0"""
         LOG.debug(f"Setting zone {self.zone_info} volume to {volume}")
-        await self._matrix.set_output_volume(self._zone_id, int(volume * 100))
+        if self._groups.led_by(self):
+            await self._async_group_send(volume=int(volume * 100))
+            return
+        self._async_set_optimistic("volume", int(volume * 100), "set_output_volume")
+        self._groups.async_set_member_volume(self, int(volume * 100))
+        await self._commands.async_set_volume(int(volume * 100))
 
     async def async_volume_up(self):
         """Volume up the media player."""
-        LOG.debug(f"async_volume_up")
-        await self._matrix.step_output_volume(self._zone_id, 5)
+        LOG.debug(f"Stepping zone {self.zone_info} volume up")
+        if self._groups.led_by(self):
+            await self._async_group_step(VOLUME_STEP)
+            return
+        self._async_step_optimistic(VOLUME_STEP)
+        await self._commands.async_step_volume(VOLUME_STEP)
 
     async def async_volume_down(self):
         """Volume down media player."""
-        LOG.debug(f"FIXME: async_volume_down")
-        await self._matrix.step_output_volume(self._zone_id, -5)
+        LOG.debug(f"Stepping zone {self.zone_info} volume down")
+        if self._groups.led_by(self):
+            await self._async_group_step(-VOLUME_STEP)
+            return
+        self._async_step_optimistic(-VOLUME_STEP)
+        await self._commands.async_step_volume(-VOLUME_STEP)
+
+    @callback
+    def _async_step_optimistic(self, step):
+        volume = self.matrix_volume
+        if volume >= 0:
+            self._async_set_optimistic(
+                "volume", max(0, min(100, volume + step)), "step_output_volume"
+            )
+            self._groups.async_set_member_volume(self, self.matrix_volume)
+
+    async def _async_group_step(self, step):
+        volume = self.matrix_volume
+        if volume >= 0:
+            await self._async_group_send(volume=max(0, min(100, volume + step)))
+
+    async def _async_group_send(self, source=None, muted=None, volume=None):
+        """Apply a change to every zone of the group this zone leads, through each zone's queue.
+
+        Members are set to the leader's new volume plus their offset, so their balance is kept.
+        """
+        zones = self._groups.led_by(self)
+        LOG.debug(f"Sending change to the {len(zones)} zones of the group led by {self.zone_info}")
+        await asyncio.gather(
+            *(
+                zone.async_queue_change(
+                    source=source,
+                    muted=muted,
+                    volume=(
+                        max(0, min(100, volume + self._groups.offset(zone)))
+                        if volume is not None
+                        else None
+                    ),
+                )
+                for zone in zones
+            )
+        )
+
+    async def async_queue_change(self, source=None, muted=None, volume=None):
+        """Queue a change made to many zones at once, showing it until the matrix confirms it.
+
+        Each zone's queue sends as soon as it is idle, so the zones are still changed concurrently,
+        and the new value replaces anything still pending for the zone.
+        """
+        sends = []
+        if muted is not None:
+            self._async_set_optimistic("muted", muted, "mute_output")
+            sends.append(self._commands.async_mute(muted))
+        if volume is not None:
+            self._async_set_optimistic("volume", volume, "set_output_volume")
+            sends.append(self._commands.async_set_volume(volume))
+        if source is not None:
+            self._async_set_optimistic("input_channel", source, "select_source")
+            sends.append(self._commands.async_select_source(source))
+        await asyncio.gather(*sends)
+
+    async def async_fade(self, duration, volume_level=None, scene=None, zones=None):
+        """Fade this zone's volume (or its group's, if it leads one) to volume_level.
+
+        Returns once the fade has completed, or been cancelled.  Scenes and zones only apply to the
+        matrix entity.
+        """
+        if volume_level is None:
+            LOG.warning(f"Fade called for {self.zone_info} without a volume_level; ignoring")
+            return
+        volume = int(volume_level * 100)
+        zones = self._groups.led_by(self)
+        if zones:
+            # Members keep their offset from the leader, as for any other group volume change
+            targets = {zone: volume + self._groups.offset(zone) for zone in zones}
+        else:
+            self._groups.async_set_member_volume(self, volume)
+            targets = {self: volume}
+        LOG.info(f"Fading {self.zone_info} to volume {volume} over {duration}s")
+        await self._fades.async_fade(targets, duration)
+
+    async def async_join_players(self, group_members):
+        """Join zones of the same matrix to a group, led by this zone."""
+        self._groups.async_join(self, group_members)
+
+    async def async_unjoin_player(self):
+        """Leave this zone's group; if this zone leads it, the group is dissolved."""
+        self._groups.async_unjoin(self)
+
+    @property
+    def command_queue_depth(self):
+        """Number of commands for this zone waiting to be sent, or in flight."""
+        return self._commands.depth
+
+    @property
+    def command_queue(self):
+        return self._commands
 
     async def _call_source_service(self, service_name):
         """Call a media_player service on the current source entity."""
@@ -524,32 +1125,6 @@ class ZoneMediaPlayer(MediaPlayerEntity):
 
     @property
     def icon(self):
-        if self._output.muted:
+        if self.is_volume_muted:
             return "mdi:speaker-off"
         return "mdi:speaker"
-
-    # For similar implementation details, see:
-    #   https://github.com/home-assistant/core/blob/dev/homeassistant/components/snapcast/media_player.py
-    # See also grouped from mini media player (which would need some support for this component):
-    #   https://github.com/kalkih/mini-media-player#speaker-group-object
-    #
-    # TODO:
-    #  - implementation should only allow a single group at a time (for simplicity)
-    #  - forward all calls to volume/source select calls to all other peers in the group
-    #  - calling any method on a grouped zone that is not a master should do what? ignore? remove from group? apply to all in group?
-    # #  - should slave group volume adjustments be relative to previous setting or absolutely mirror the master? (downsides to both, but possibly relative is most user friendly)
-
-    # async def async_join(self, master_zone_id, add_zones):
-    #     """Join several zones into a group which is controlled/coordinated by a master zone.
-    #     All volume/mute/source options to the master zone apply to all zones."""
-    #     if not add_zones:
-    #         return
-    #     LOG.info(f"Adding {self._amp_name} zones {add_zones} to group")
-    #     # FIXME: implement
-
-    # async def async_unjoin(self, remove_zones):
-    #     """Remove a set of zones from the group (including master will delete the group)"""
-    #     if not remove_zones:
-    #         return
-    #     LOG.info(f"Removing {self._amp_name} zones {remove_zones} from group")
-    #     # FIXME: implement
@@ -0,0 +1,81 @@
+"""Optimistic zone state, held until the matrix confirms a command."""
+import logging
+import time
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class LatencyStats:
+    """Running command-to-confirmation latency for one operation, in seconds."""
+
+    __slots__ = ("count", "total", "last", "max", "timeouts")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+        self.max = 0.0
+        self.timeouts = 0
+
+    def record(self, latency: float):
+        self.count += 1
+        self.total += latency
+        self.last = latency
+        self.max = max(self.max, latency)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "last": self.last,
+            "max": self.max,
+            "timeouts": self.timeouts,
+        }
+
+
+class OptimisticState:
+    """Tracks the intended value of output attributes (volume, muted, input_channel).
+
+    The intended value is served in place of the matrix value until a notification confirms it,
+    or until the timeout elapses, at which point the matrix value is served again.
+    """
+
+    def __init__(self, timeout: float):
+        self._timeout = timeout
+        self._pending = {}
+        self.latency = {}
+
+    def set(self, attr: str, value, operation: str):
+        """Record the value a command has just asked the matrix to apply."""
+        self._pending[attr] = (value, time.monotonic(), operation)
+
+    def get(self, attr: str, actual):
+        """Return the intended value for attr if one is pending, otherwise the matrix value."""
+        pending = self._pending.get(attr)
+        if pending is None or time.monotonic() - pending[1] > self._timeout:
+            return actual
+        return pending[0]
+
+    def reconcile(self, output):
+        """Drop intended values which the matrix output now confirms, recording their latency."""
+        now = time.monotonic()
+        for attr, (value, sent, operation) in list(self._pending.items()):
+            if getattr(output, attr) == value:
+                del self._pending[attr]
+                self.latency.setdefault(operation, LatencyStats()).record(now - sent)
+
+    def expire(self) -> bool:
+        """Drop intended values which were never confirmed; returns True if any were dropped."""
+        now = time.monotonic()
+        expired = False
+        for attr, (value, sent, operation) in list(self._pending.items()):
+            if now - sent >= self._timeout:
+                del self._pending[attr]
+                self.latency.setdefault(operation, LatencyStats()).timeouts += 1
+                LOG.debug(f"{operation} to {value} was not confirmed within {self._timeout}s")
+                expired = True
+        return expired
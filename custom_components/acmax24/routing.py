@@ -0,0 +1,143 @@
+"""Routing zones to an input automatically when audio appears on it."""
+import logging
+from functools import partial
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+
+from .commands import CommandBatch
+from .const import CONF_INPUT, CONF_REVERT_AFTER, CONF_VOLUME, CONF_ZONES
+from .dispatcher import input_key, snapshot_output
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+AUTO_ROUTE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_INPUT): vol.All(vol.Coerce(int), vol.Range(min=1, max=24)),
+        vol.Required(CONF_ZONES): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=1, max=24))]
+        ),
+        vol.Optional(CONF_VOLUME): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+        vol.Optional(CONF_REVERT_AFTER): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+AUTO_ROUTES_SCHEMA = vol.All(cv.ensure_list, [AUTO_ROUTE_SCHEMA])
+
+
+class AutoRouter:
+    """Routes zones to an input when it gains audio, and optionally back again after a silence.
+
+    Rules are indexed by input, and run from the dispatcher's pass over each matrix notification,
+    so only the inputs with rules are looked at and the zones are switched together, each through
+    its own command queue.
+    Reverting restores each zone's previous source and volume, unless it has since been routed
+    elsewhere.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub, rules: list, fades=None, zones=None):
+        self._hass = hass
+        self._fades = fades
+        # Output index -> zone entity; switches go through the zones' queues (see CommandBatch)
+        self._zones = zones
+        self._matrix = hub.matrix
+        self._dispatcher = hub.dispatcher
+        self._rules = {}  # input index -> [rule, ...]
+        self._has_audio = {}
+        self._saved = {}  # input index -> {output index: OutputState before the rule applied}
+        self._unsub_revert = {}
+        self._unsubs = []
+
+        self.activations = 0
+        self.reverts = 0
+
+        for rule in rules:
+            zones = [idx for idx in rule[CONF_ZONES] if idx in hub.output_ids]
+            if len(zones) != len(rule[CONF_ZONES]):
+                LOG.warning(f"Auto-route for input {rule[CONF_INPUT]} ignores disabled zones")
+            if rule[CONF_INPUT] not in hub.input_ids or not zones:
+                LOG.warning(f"Ignoring auto-route for disabled input {rule[CONF_INPUT]} or zones")
+                continue
+            self._rules.setdefault(rule[CONF_INPUT], []).append({**rule, CONF_ZONES: zones})
+
+    @callback
+    def async_start(self):
+        for idx in self._rules:
+            # Unknown until the matrix is ready; audio which is already playing doesn't count as an edge
+            self._has_audio[idx] = (
+                self._matrix.get_input(idx).has_audio if self._dispatcher.ready else None
+            )
+            self._unsubs.append(
+                self._dispatcher.async_add_listener(
+                    input_key(idx), lambda idx=idx: self._async_handle_input(idx)
+                )
+            )
+
+    @callback
+    def async_stop(self):
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        for idx in list(self._unsub_revert):
+            self._async_cancel_revert(idx)
+
+    @callback
+    def _async_handle_input(self, idx):
+        has_audio = self._matrix.get_input(idx).has_audio
+        previous, self._has_audio[idx] = self._has_audio[idx], has_audio
+        if previous is None or has_audio == previous:
+            return
+
+        if has_audio:
+            if idx in self._unsub_revert:
+                # Back before the silence was long enough to revert; the zones are still routed here
+                self._async_cancel_revert(idx)
+            else:
+                self._async_apply(idx)
+        elif idx in self._saved:
+            revert_after = max(rule.get(CONF_REVERT_AFTER, -1) for rule in self._rules[idx])
+            if revert_after >= 0:
+                self._unsub_revert[idx] = async_call_later(
+                    self._hass, revert_after, partial(self._async_revert, idx)
+                )
+
+    @callback
+    def _async_apply(self, idx):
+        batch = CommandBatch(self._matrix, self._zones)
+        saved = {}
+        for rule in self._rules[idx]:
+            for zone in rule[CONF_ZONES]:
+                saved.setdefault(zone, snapshot_output(self._matrix.get_output(zone)))
+                batch.select_source(zone, idx)
+                if CONF_VOLUME in rule:
+                    batch.set_volume(zone, rule[CONF_VOLUME])
+        self._saved[idx] = saved
+        if self._fades and any(CONF_VOLUME in rule for rule in self._rules[idx]):
+            self._fades.async_cancel(saved)
+        self.activations += 1
+        LOG.info(f"Audio on input {idx}, routing zones {sorted(saved)} to it")
+        self._hass.async_create_task(batch.async_send())
+
+    @callback
+    def _async_revert(self, idx, _now=None):
+        self._unsub_revert.pop(idx, None)
+        batch = CommandBatch(self._matrix, self._zones)
+        reverted = []
+        for zone, state in self._saved.pop(idx, {}).items():
+            # Leave zones which have been routed elsewhere since
+            if self._matrix.get_output(zone).input_channel == idx:
+                batch.restore(zone, state)
+                reverted.append(zone)
+        if self._fades:
+            self._fades.async_cancel(reverted)
+        self.reverts += 1
+        LOG.info(f"Input {idx} silent, reverting {len(batch)} auto-routed settings")
+        self._hass.async_create_task(batch.async_send())
+
+    @callback
+    def _async_cancel_revert(self, idx):
+        unsub = self._unsub_revert.pop(idx, None)
+        if unsub:
+            unsub()
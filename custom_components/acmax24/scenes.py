@@ -0,0 +1,67 @@
+"""Named, persistent snapshots of AC-MAX-24 output state."""
+import logging
+from collections import OrderedDict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .dispatcher import OutputState
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class SceneStore:
+    """Keeps named scenes (a partial or full set of OutputStates), evicting the least recently used.
+
+    Scenes are loaded from HA storage the first time they are needed, and written back lazily.
+    Each output is stored as a compact [output, input, volume, muted] row.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str, max_scenes: int):
+        self._store = Store(hass, STORAGE_VERSION, key)
+        self._max_scenes = max_scenes
+        self._scenes = None
+
+    async def _async_load(self):
+        if self._scenes is not None:
+            return self._scenes
+
+        self._scenes = OrderedDict()
+        data = await self._store.async_load() or {}
+        for name, rows in data.get("scenes", []):
+            self._scenes[name] = {
+                row[0]: OutputState(row[1], row[2], bool(row[3]), None) for row in rows
+            }
+        LOG.debug(f"Loaded {len(self._scenes)} scenes from {self._store.key}")
+        return self._scenes
+
+    @callback
+    def _data_to_save(self):
+        return {
+            "scenes": [
+                [name, [[idx, s.input_channel, s.volume, int(s.muted)] for idx, s in outputs.items()]]
+                for name, outputs in self._scenes.items()
+            ]
+        }
+
+    async def async_save_scene(self, name: str, outputs: dict):
+        """Store a scene, replacing any existing scene with the same name."""
+        scenes = await self._async_load()
+        scenes[name] = outputs
+        scenes.move_to_end(name)
+        while len(scenes) > self._max_scenes:
+            evicted, _ = scenes.popitem(last=False)
+            LOG.info(f"Evicted least recently used scene '{evicted}'")
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_get_scene(self, name: str):
+        """Return the outputs for a scene, or None if it does not exist."""
+        scenes = await self._async_load()
+        outputs = scenes.get(name)
+        if outputs is not None:
+            scenes.move_to_end(name)
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return outputs
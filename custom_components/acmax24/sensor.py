@@ -0,0 +1,114 @@
+"""Optional diagnostic sensors for an AC-MAX-24 connection."""
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ENTITY_NAMESPACE, CONF_HOST, CONF_NAME, EntityCategory
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DIAGNOSTICS, DOMAIN
+from .hub import HUBS
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    if discovery_info is None:
+        return
+    hub = hass.data[DOMAIN][HUBS][discovery_info["host"]]
+    async_add_entities(
+        _diagnostic_sensors(discovery_info["namespace"], discovery_info["matrix_name"], hub), True
+    )
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
+    if not entry.options.get(CONF_DIAGNOSTICS):
+        return
+    hub = hass.data[DOMAIN][HUBS][entry.data[CONF_HOST]]
+    async_add_entities(
+        _diagnostic_sensors(entry.data[CONF_ENTITY_NAMESPACE], entry.data[CONF_NAME], hub), True
+    )
+
+
+def _diagnostic_sensors(namespace, matrix_name, hub):
+    return [
+        sensor(namespace, matrix_name, hub)
+        for sensor in (
+            NotifyRateSensor,
+            DispatchLatencySensor,
+            SuppressedUpdatesSensor,
+            ReconnectsSensor,
+        )
+    ]
+
+
+class DiagnosticSensor(SensorEntity):
+    """Base for the sensors reporting on a hub; these are polled, so cost nothing in between."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    key = None
+    label = None
+
+    def __init__(self, namespace: str, matrix_name: str, hub):
+        self._hub = hub
+        self._dispatcher = hub.dispatcher
+        self._attr_name = f"{matrix_name} {self.label}"
+        self._attr_unique_id = (
+            f"acmax24_{namespace}_{matrix_name}_{self.key}".lower().replace(" ", "_")
+        )
+
+
+class NotifyRateSensor(DiagnosticSensor):
+    """Notifications received from the matrix per minute, over the last scan interval."""
+
+    key = "notify_rate"
+    label = "Notify Rate"
+    _attr_native_unit_of_measurement = "notifications/min"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, namespace, matrix_name, hub):
+        super().__init__(namespace, matrix_name, hub)
+        self._last = (time.monotonic(), self._dispatcher.notifications)
+
+    async def async_update(self):
+        now, notifications = time.monotonic(), self._dispatcher.notifications
+        elapsed = now - self._last[0]
+        if elapsed > 0:
+            self._attr_native_value = round((notifications - self._last[1]) * 60 / elapsed, 1)
+        self._last = (now, notifications)
+
+
+class DispatchLatencySensor(DiagnosticSensor):
+    """95th percentile of the time from a matrix notification to its entities being updated."""
+
+    key = "dispatch_latency"
+    label = "Dispatch Latency"
+    _attr_native_unit_of_measurement = "ms"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    async def async_update(self):
+        histogram = self._dispatcher.dispatch_latency
+        self._attr_native_value = histogram.percentile(95) if histogram else None
+        self._attr_extra_state_attributes = histogram.as_dict() if histogram else {}
+
+
+class SuppressedUpdatesSensor(DiagnosticSensor):
+    key = "suppressed_updates"
+    label = "Suppressed Updates"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    async def async_update(self):
+        self._attr_native_value = self._dispatcher.suppressed_updates
+
+
+class ReconnectsSensor(DiagnosticSensor):
+    key = "reconnects"
+    label = "Reconnects"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    async def async_update(self):
+        self._attr_native_value = self._hub.reconnects
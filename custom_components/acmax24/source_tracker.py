@@ -0,0 +1,66 @@
+"""Shared tracking of the HA entities mapped to AC-MAX-24 inputs."""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class SourceEntityTracker:
+    """One state-change subscription per matrix, for every entity in the source_entity_map.
+
+    Zones report which source entity they are currently routed to, and a reverse index from
+    entity_id to those zones means a source update only wakes the zones actually playing it.
+    """
+
+    def __init__(self, hass: HomeAssistant, source_entity_map: dict):
+        self._hass = hass
+        # source label -> HA entity_id map (e.g. {"James Matrix": "media_player.james_matrix"})
+        self._source_entity_map = source_entity_map or {}
+        self._routes = {}
+        self._index = {}
+        self._unsub = None
+
+    def entity_for(self, label):
+        """Return the entity_id mapped to a source label, or None."""
+        return self._source_entity_map.get(label)
+
+    @callback
+    def async_start(self):
+        if self._source_entity_map and self._unsub is None:
+            self._unsub = async_track_state_change_event(
+                self._hass, list(self._source_entity_map.values()), self._async_handle_state_change
+            )
+
+    @callback
+    def async_stop(self):
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_set_route(self, zone, entity_id):
+        """Record the source entity a zone is routed to; None removes the zone from the index."""
+        old = self._routes.get(zone)
+        if old == entity_id:
+            return
+        if old is not None:
+            zones = self._index[old]
+            zones.discard(zone)
+            if not zones:
+                del self._index[old]
+        if entity_id is None:
+            self._routes.pop(zone, None)
+        else:
+            self._routes[zone] = entity_id
+            self._index.setdefault(entity_id, set()).add(zone)
+
+    @callback
+    def _async_handle_state_change(self, event):
+        zones = self._index.get(event.data.get("entity_id"))
+        if not zones:
+            return
+        new_state = event.data.get("new_state")
+        for zone in list(zones):
+            zone.async_handle_source_state(new_state)
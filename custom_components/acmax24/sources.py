@@ -0,0 +1,54 @@
+"""The selectable sources of an AC-MAX-24, shared by all of its entities."""
+import logging
+
+from homeassistant.core import callback
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+
+class SourceRegistry:
+    """The enabled inputs of one matrix, by index and by label.
+
+    Entities hold a reference to the matrix's registry rather than copies of its maps.  Labels are
+    refreshed in place when the matrix reports a change, bumping the version, and source_list is an
+    immutable tuple which is only rebuilt when a label changes.
+    """
+
+    __slots__ = ("_matrix", "_labels", "_indexes", "source_list", "version")
+
+    def __init__(self, matrix, input_ids):
+        self._matrix = matrix
+        self._labels = {idx: None for idx in sorted(input_ids)}
+        self._indexes = {}
+        self.source_list = ()
+        self.version = 0
+        self.async_refresh()
+
+    def label(self, idx):
+        """The label of an enabled input, or None."""
+        return self._labels.get(idx)
+
+    def index(self, label):
+        """The index of the enabled input with a label, or None."""
+        return self._indexes.get(label)
+
+    @callback
+    def async_refresh(self) -> bool:
+        """Pick up changed input labels from the matrix; returns True if any changed."""
+        changed = False
+        for idx, old in self._labels.items():
+            label = self._matrix.get_input(idx).label
+            if label != old:
+                if self._indexes.get(old) == idx:
+                    del self._indexes[old]
+                self._labels[idx] = label
+                self._indexes[label] = idx
+                changed = True
+        if changed:
+            self.source_list = tuple(self._labels.values())
+            self.version += 1
+            LOG.debug(f"Sources are now {self.source_list} (version {self.version})")
+        return changed
+
+    def __repr__(self):
+        return f"SourceRegistry(version={self.version}, sources={self.source_list})"
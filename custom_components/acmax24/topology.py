@@ -0,0 +1,36 @@
+"""Persisted topology of an AC-MAX-24, for creating entities before the matrix answers."""
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+LOG: logging.Logger = logging.getLogger(__package__)
+
+STORAGE_VERSION = 1
+
+
+class TopologyStore:
+    """Stores the enabled inputs and outputs of a matrix, and their labels, as [index, label] rows."""
+
+    def __init__(self, hass: HomeAssistant, key: str):
+        self._store = Store(hass, STORAGE_VERSION, key)
+
+    async def async_load(self):
+        """Return ({input index: label}, {output index: label}) from the last run, or None."""
+        data = await self._store.async_load()
+        if not data or not data.get("outputs"):
+            return None
+        return (
+            {idx: label for idx, label in data["inputs"]},
+            {idx: label for idx, label in data["outputs"]},
+        )
+
+    async def async_save(self, matrix):
+        """Save the matrix's current enabled inputs/outputs and their labels."""
+        await self._store.async_save(
+            {
+                "inputs": sorted([i.index, i.label] for i in matrix.get_enabled_inputs()),
+                "outputs": sorted([o.index, o.label] for o in matrix.get_enabled_outputs()),
+            }
+        )
+        LOG.debug(f"Saved matrix topology to {self._store.key}")
@@ -0,0 +1 @@
+"""Tests for the AVPro Edge AC-MAX-24 integration."""
@@ -0,0 +1,154 @@
+"""Fixtures for the AC-MAX-24 tests: a bare Home Assistant core, a matrix without hardware, and
+entities for it."""
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from acmax24 import ACMax24
+from homeassistant.core import HomeAssistant
+
+from custom_components.acmax24.dispatcher import MatrixDispatcher
+from custom_components.acmax24.fades import FadeEngine
+from custom_components.acmax24.groups import ZoneGroups
+from custom_components.acmax24.media_player import ACMax24Entity, ZoneMediaPlayer
+from custom_components.acmax24.source_tracker import SourceEntityTracker
+from custom_components.acmax24.sources import SourceRegistry
+
+
+class FakeTransport:
+    """Stands in for the websocket; commands are recorded, and echoed back as the device would."""
+
+    socket = None
+
+    def __init__(self, matrix):
+        self._matrix = matrix
+        self.sent = []
+        # While set and cleared, commands stay in flight until the test sets it
+        self.gate = None
+        # Sent back by refresh(), ahead of the marker which ends the matrix's configuration
+        self.config = []
+
+    async def send(self, message):
+        if self.gate is not None:
+            await self.gate.wait()
+        message = message.strip("\r\n")
+        self.sent.append(message)
+        await self._matrix._process_event(message)
+
+    async def refresh(self):
+        for message in self.config:
+            await self._matrix._process_event(message)
+        await self._matrix._process_event("SET DHCP ON")
+
+    async def refresh_signal_status(self):
+        pass
+
+
+async def _async_ignore():
+    pass
+
+
+def make_matrix(inputs=4, outputs=4) -> ACMax24:
+    """A matrix with its initial state received, every output at volume 20 on input 1."""
+    matrix = ACMax24("fake", _async_ignore)
+    for idx in range(1, inputs + 1):
+        matrix._inputs[idx]._enabled = True
+        matrix._inputs[idx]._label = f"Input {idx}"
+    for idx in range(1, outputs + 1):
+        output = matrix._outputs[idx]
+        output._enabled = True
+        output._label = f"Zone {idx}"
+        output._volume = 20
+        output._input_channel = 1
+    matrix._initial_io_config_received = True
+    matrix._initial_labels_fetched = True
+    matrix._transport = FakeTransport(matrix)
+    return matrix
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    hass = HomeAssistant(str(tmp_path))
+    hass.config.skip_pip = True
+    yield hass
+    await hass.async_block_till_done()
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def matrix():
+    return make_matrix()
+
+
+class Rig:
+    """A matrix's zone and matrix entities, wired to a dispatcher but not to an entity platform."""
+
+    def __init__(self, hass, matrix, **zone_options):
+        self.hass = hass
+        self.matrix = matrix
+        self.dispatcher = MatrixDispatcher(hass, matrix)
+        self.groups = ZoneGroups()
+        # Ticks well apart from each other, but quickly enough to keep the tests short
+        self.fades = FadeEngine(hass, timedelta(milliseconds=20))
+        output_ids = sorted(o.index for o in matrix.get_enabled_outputs())
+        input_ids = sorted(i.index for i in matrix.get_enabled_inputs())
+        self.sources = SourceRegistry(matrix, input_ids)
+        self.hub = SimpleNamespace(
+            hostname="fake",
+            matrix=matrix,
+            dispatcher=self.dispatcher,
+            input_ids=input_ids,
+            output_ids=output_ids,
+            connected=True,
+            reconnects=0,
+            startup={},
+        )
+        self.source_tracker = SourceEntityTracker(hass, {})
+        self.zones = [
+            ZoneMediaPlayer(
+                "test",
+                "Matrix",
+                matrix,
+                self.dispatcher,
+                self.sources,
+                matrix.get_output(idx),
+                self.source_tracker,
+                self.groups,
+                self.fades,
+                **zone_options,
+            )
+            for idx in output_ids
+        ]
+        self.entity = ACMax24Entity(
+            hass, "test", "Matrix", self.hub, self.sources, self.zones, self.fades, None
+        )
+
+        async def _async_notify():
+            self.dispatcher.notify()
+
+        matrix._notify_callback = _async_notify
+
+    async def async_start(self):
+        self.dispatcher.async_set_ready()
+        for idx, zone in enumerate(self.zones, 1):
+            await self._async_add(zone, f"media_player.zone_{idx}")
+        await self._async_add(self.entity, "media_player.matrix")
+
+    async def _async_add(self, entity, entity_id):
+        entity.hass = self.hass
+        entity.entity_id = entity_id
+        await entity.async_added_to_hass()
+
+    async def async_stop(self):
+        self.fades.async_stop()
+        for entity in (*self.zones, self.entity):
+            await entity.async_remove(force_remove=True)
+        await self.hass.async_block_till_done()
+
+
+@pytest.fixture
+async def rig(hass, matrix):
+    rig = Rig(hass, matrix)
+    await rig.async_start()
+    yield rig
+    await rig.async_stop()
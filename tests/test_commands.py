@@ -0,0 +1,91 @@
+"""Tests for the per-output command queue and command batches."""
+import asyncio
+
+from custom_components.acmax24.commands import CommandBatch, OutputCommandQueue
+from custom_components.acmax24.dispatcher import OutputState, snapshot_output
+
+
+class GatedMatrix:
+    """Records output commands, each of which stays in flight until the test releases it."""
+
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+        self.fail = set()
+
+    async def _send(self, kind, value):
+        await self.gate.wait()
+        if (kind, value) in self.fail:
+            raise ConnectionError("socket not connected")
+        self.sent.append((kind, value))
+
+    async def set_output_volume(self, idx, volume):
+        await self._send("volume", volume)
+
+    async def step_output_volume(self, idx, step):
+        await self._send("step", step)
+
+    async def mute_output(self, idx, muted):
+        await self._send("mute", muted)
+
+    async def change_input_for_output(self, idx, input_idx):
+        await self._send("source", input_idx)
+
+
+async def test_steps_merge_while_in_flight():
+    matrix = GatedMatrix()
+    queue = OutputCommandQueue(matrix, 1)
+    first = asyncio.create_task(queue.async_step_volume(5))
+    await asyncio.sleep(0)
+    # Each of these finds the queue busy, and returns once its step is merged
+    for _ in range(3):
+        await queue.async_step_volume(5)
+    assert queue.depth == 2
+    matrix.gate.set()
+    await first
+    assert matrix.sent == [("step", 5), ("step", 15)]
+    assert queue.merged == 2
+    assert queue.depth == 0
+
+
+async def test_absolute_volume_supersedes_steps_and_latest_wins():
+    matrix = GatedMatrix()
+    queue = OutputCommandQueue(matrix, 1)
+    first = asyncio.create_task(queue.async_set_volume(10))
+    await asyncio.sleep(0)
+    await queue.async_step_volume(5)
+    await queue.async_set_volume(40)
+    await queue.async_set_volume(150)
+    matrix.gate.set()
+    await first
+    assert matrix.sent == [("volume", 10), ("volume", 100)]
+
+
+async def test_failed_send_keeps_draining_merged_commands():
+    matrix = GatedMatrix()
+    matrix.fail = {("volume", 10)}
+    queue = OutputCommandQueue(matrix, 1)
+    first = asyncio.create_task(queue.async_set_volume(10))
+    await asyncio.sleep(0)
+    # Merged while the failing command is in flight; these callers have already returned
+    await queue.async_set_volume(30)
+    await queue.async_mute(True)
+    matrix.gate.set()
+    await first
+    assert matrix.sent == [("mute", True), ("volume", 30)]
+    assert queue.failed == 1
+    assert queue.sent == 2
+    assert queue.depth == 0
+
+
+async def test_batch_restore_only_queues_what_changed(matrix):
+    saved = snapshot_output(matrix.get_output(1))
+    await matrix._process_event("SET OUT1 VOL 45")
+    batch = CommandBatch(matrix)
+    batch.restore(1, saved)
+    # Outputs whose state is unknown (-1 volume, input 0) are left as they are
+    batch.restore(2, OutputState(0, -1, False, "Zone 2"))
+    matrix._transport.sent.clear()
+
+    assert await batch.async_send() == 1
+    assert matrix._transport.sent == ["SET OUT1 VOL 20", "SET OUT1 VOL 20"]
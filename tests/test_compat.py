@@ -0,0 +1,25 @@
+"""Tests for the fallbacks around the acmax24 library's private attributes."""
+import logging
+
+from custom_components.acmax24.compat import get_private, set_private, transport_socket
+
+
+class Bare:
+    pass
+
+
+def test_missing_attributes_fall_back_with_one_warning(caplog):
+    obj = Bare()
+    with caplog.at_level(logging.WARNING):
+        assert get_private(obj, "_gone", 5) == 5
+        assert get_private(obj, "_gone") is None
+        assert not set_private(obj, "_gone", 1)
+    assert not hasattr(obj, "_gone")
+    assert len([r for r in caplog.records if "_gone" in r.message]) == 1
+
+
+def test_present_attributes_are_used(matrix):
+    assert set_private(matrix, "_initial_io_config_received", False)
+    assert get_private(matrix, "_initial_io_config_received") is False
+    assert transport_socket(matrix) is None
+    assert transport_socket(Bare()) is None
@@ -0,0 +1,59 @@
+"""Tests for the options flow's validation."""
+import inspect
+from types import MappingProxyType
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ENTITY_NAMESPACE, CONF_HOST, CONF_NAME
+
+from custom_components.acmax24.config_flow import ACMax24OptionsFlow
+from custom_components.acmax24.const import CONF_AUTO_ROUTES, CONF_SOURCE_ENTITY_MAP, DOMAIN
+
+
+def make_entry():
+    """A config entry, given only the arguments this version of Home Assistant's ConfigEntry takes.
+
+    Later versions make discovery_keys, options, subentries_data and unique_id required.
+    """
+    arguments = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": "Matrix",
+        "data": {CONF_HOST: "matrix.local", CONF_NAME: "Matrix", CONF_ENTITY_NAMESPACE: "matrix"},
+        "source": "user",
+        "options": {},
+        "unique_id": "matrix.local",
+        "discovery_keys": MappingProxyType({}),
+        "subentries_data": None,
+    }
+    accepted = inspect.signature(ConfigEntry.__init__).parameters
+    return ConfigEntry(**{key: value for key, value in arguments.items() if key in accepted})
+
+
+def make_flow(hass):
+    entry = make_entry()
+    flow = ACMax24OptionsFlow(entry)
+    flow.hass = hass
+    flow.handler = entry.entry_id
+    return flow
+
+
+async def test_bad_source_entity_map_is_refused(hass):
+    flow = make_flow(hass)
+    result = await flow.async_step_init({CONF_SOURCE_ENTITY_MAP: {"TV": "not an entity id"}})
+    assert result["type"] == "form"
+    assert result["errors"] == {CONF_SOURCE_ENTITY_MAP: "invalid_source_entity_map"}
+
+
+async def test_bad_auto_routes_are_refused(hass):
+    flow = make_flow(hass)
+    result = await flow.async_step_init({CONF_AUTO_ROUTES: [{"input": 99, "zones": [1]}]})
+    assert result["errors"] == {CONF_AUTO_ROUTES: "invalid_auto_routes"}
+
+
+async def test_valid_options_are_saved(hass):
+    flow = make_flow(hass)
+    options = {CONF_SOURCE_ENTITY_MAP: {"TV": "media_player.tv"}}
+    result = await flow.async_step_init(options)
+    assert result["type"] == "create_entry"
+    assert result["data"] == options
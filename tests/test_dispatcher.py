@@ -0,0 +1,103 @@
+"""Tests for diffing matrix notifications into per-entity updates."""
+import asyncio
+
+from custom_components.acmax24.dispatcher import OUTPUTS, MatrixDispatcher, input_key, output_key
+
+
+def make_dispatcher(hass, matrix, window=0):
+    dispatcher = MatrixDispatcher(hass, matrix, window)
+
+    async def _async_notify():
+        dispatcher.notify()
+
+    matrix._notify_callback = _async_notify
+    return dispatcher
+
+
+def listen(dispatcher, *keys):
+    """Count how many times each key's listeners are woken."""
+    woken = {key: 0 for key in keys}
+    for key in keys:
+        dispatcher.async_add_listener(key, lambda key=key: woken.__setitem__(key, woken[key] + 1))
+    return woken
+
+
+async def test_only_the_changed_output_is_woken(hass, matrix):
+    dispatcher = make_dispatcher(hass, matrix)
+    dispatcher.async_set_ready()
+    woken = listen(dispatcher, output_key(1), output_key(2), input_key(1), OUTPUTS)
+
+    await matrix._process_event("SET OUT2 VOL 40")
+    await hass.async_block_till_done()
+
+    assert woken == {output_key(1): 0, output_key(2): 1, input_key(1): 0, OUTPUTS: 1}
+    assert dispatcher.dispatched_updates == 2
+    assert dispatcher.suppressed_updates == 2
+
+
+async def test_unchanged_state_wakes_nothing(hass, matrix):
+    dispatcher = make_dispatcher(hass, matrix)
+    dispatcher.async_set_ready()
+    woken = listen(dispatcher, output_key(1), OUTPUTS)
+
+    # Every command is echoed twice by the matrix; the second changes nothing
+    await matrix._process_event("SET OUT1 VOL 30")
+    await matrix._process_event("SET OUT1 VOL 30")
+    await hass.async_block_till_done()
+
+    assert woken == {output_key(1): 1, OUTPUTS: 1}
+    assert dispatcher.notifications == 2
+
+
+async def test_outputs_listeners_are_woken_once_per_pass(hass, matrix):
+    dispatcher = make_dispatcher(hass, matrix)
+    dispatcher.async_set_ready()
+    woken = listen(dispatcher, OUTPUTS)
+
+    for idx in range(1, 5):
+        matrix.get_output(idx)._volume = 50
+    dispatcher.async_process()
+
+    assert woken == {OUTPUTS: 1}
+
+
+async def test_notifications_are_ignored_until_ready(hass, matrix):
+    dispatcher = make_dispatcher(hass, matrix)
+    woken = listen(dispatcher, output_key(1))
+
+    await matrix._process_event("SET OUT1 VOL 30")
+    await hass.async_block_till_done()
+    assert woken == {output_key(1): 0}
+
+    dispatcher.async_set_ready()
+    assert woken == {output_key(1): 1}
+
+
+async def test_burst_is_coalesced_into_one_pass(hass, matrix):
+    dispatcher = make_dispatcher(hass, matrix, window=0.05)
+    dispatcher.async_set_ready()
+    woken = listen(dispatcher, output_key(1), output_key(2))
+
+    for volume in (21, 22, 23):
+        await matrix._process_event(f"SET OUT1 VOL {volume}")
+    await matrix._process_event("SET OUT2 MUTE")
+    await hass.async_block_till_done()
+    assert woken == {output_key(1): 0, output_key(2): 0}
+
+    dispatcher.async_flush()
+    assert woken == {output_key(1): 1, output_key(2): 1}
+    assert dispatcher.batches == 1
+    assert dispatcher.last_batch_size == 4
+
+
+async def test_coalescing_window_flushes_on_its_own(hass, matrix):
+    dispatcher = make_dispatcher(hass, matrix, window=0.01)
+    dispatcher.async_set_ready()
+    woken = listen(dispatcher, output_key(1))
+
+    await matrix._process_event("SET OUT1 VOL 21")
+    await matrix._process_event("SET OUT1 VOL 22")
+    await asyncio.sleep(0.05)
+
+    assert woken == {output_key(1): 1}
+    assert dispatcher.batches == 1
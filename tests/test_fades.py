@@ -0,0 +1,55 @@
+"""Tests for volume fades."""
+import asyncio
+
+
+def volumes(transport, output_idx):
+    prefix = f"SET OUT{output_idx} VOL "
+    return [int(m[len(prefix):]) for m in transport.sent if m.startswith(prefix)]
+
+
+async def test_fade_ramps_to_its_target(rig):
+    zone = rig.zones[0]
+    await zone.async_fade(0.2, volume_level=0.6)
+    await rig.hass.async_block_till_done()
+
+    sent = volumes(rig.matrix._transport, 1)
+    assert sent == sorted(sent)
+    assert len(set(sent)) > 2
+    assert rig.matrix.get_output(1).volume == 60
+    assert rig.fades.completed == 1
+    assert rig.fades.active == 0
+
+
+async def test_volume_change_cancels_a_fade(rig):
+    zone = rig.zones[0]
+    transport = rig.matrix._transport
+    fade = asyncio.create_task(zone.async_fade(1, volume_level=0.8))
+    await asyncio.sleep(0.1)
+
+    await zone.async_set_volume_level(0.1)
+    await fade
+    sent = len(transport.sent)
+    await asyncio.sleep(0.1)
+    await rig.hass.async_block_till_done()
+
+    assert rig.fades.cancelled == 1
+    assert rig.fades.active == 0
+    # Nothing more was sent for the fade once the volume had been set
+    assert len(transport.sent) == sent
+    assert rig.matrix.get_output(1).volume == 10
+
+
+async def test_fade_only_cancels_its_own_zone(rig):
+    first, second = rig.zones[:2]
+    fades = asyncio.gather(
+        first.async_fade(0.2, volume_level=0.5), second.async_fade(0.2, volume_level=0.5)
+    )
+    await asyncio.sleep(0.05)
+    await first.async_mute_volume(True)
+    await second.async_set_volume_level(0.3)
+    await fades
+
+    assert rig.fades.cancelled == 1
+    assert rig.fades.completed == 1
+    assert rig.matrix.get_output(1).volume == 50
+    assert rig.matrix.get_output(2).volume == 30
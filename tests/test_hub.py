@@ -0,0 +1,82 @@
+"""Tests for the per-host hub shared by the YAML platform and config entries."""
+import asyncio
+import time
+
+from custom_components.acmax24.dispatcher import MatrixDispatcher, output_key
+from custom_components.acmax24.hub import MatrixHub
+
+from .conftest import make_matrix
+
+
+async def test_concurrent_setups_start_the_connection_once(hass):
+    hub = MatrixHub(hass, "matrix.local")
+    hub.matrix = make_matrix()
+    hub.matrix.start = starts = _Counter()
+    hub.async_refresh_labels = _async_true
+
+    results = await asyncio.gather(hub.async_setup(), hub.async_setup())
+    hub.async_stop()
+
+    assert results == [True, True]
+    assert starts.count == 1
+    assert hub.output_ids == [1, 2, 3, 4]
+
+
+async def test_unloading_one_platform_keeps_the_others_entities(hass):
+    hub = MatrixHub(hass, "matrix.local")
+    unregister_yaml = hub.async_register_entities("yaml entity", None, "yaml fades", None)
+    unregister_entry = hub.async_register_entities("entry entity", None, "entry fades", None)
+
+    unregister_entry()
+    assert hub.matrix_entity == "yaml entity"
+    assert hub.fades == "yaml fades"
+
+    unregister_yaml()
+    assert hub.matrix_entity is None
+    assert hub.fades is None
+
+
+async def test_resync_dispatches_drift_when_labels_cannot_be_fetched(hass):
+    hub = MatrixHub(hass, "matrix.local")
+    hub.matrix = make_matrix()
+    hub.dispatcher = MatrixDispatcher(hass, hub.matrix)
+    hub.matrix._notify_callback = _async_notify(hub.dispatcher)
+    hub.async_refresh_labels = _async_false
+    hub.dispatcher.async_set_ready()
+    woken = []
+    hub.dispatcher.async_add_listener(output_key(1), lambda: woken.append(1))
+    # OUT1 was changed while the connection was down, and is re-sent once it is back
+    hub.matrix._transport.config = ["SET OUT1 VOL 55", "SET OUT2 VOL 20"]
+
+    await hub._async_resync(None, time.monotonic(), 0, 0)
+
+    assert woken == [1]
+    assert hub.last_resync["complete"]
+    assert not hub.last_resync["labels_fetched"]
+    assert hub.last_resync["updated_entities"] == 1
+
+
+class _Counter:
+    def __init__(self):
+        self.count = 0
+
+    async def __call__(self):
+        self.count += 1
+        # Gives a second, unserialised setup the chance to start the connection too
+        await asyncio.sleep(0.01)
+
+
+async def _async_true():
+    return True
+
+
+async def _async_false():
+    return False
+
+
+def _async_notify(dispatcher):
+    async def _async_notify():
+        dispatcher.notify()
+
+    return _async_notify
+
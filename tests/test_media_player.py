@@ -0,0 +1,61 @@
+"""Tests for the zone and matrix entities' commands."""
+import asyncio
+
+
+async def settle():
+    """Let tasks started by the test run until they wait for the transport."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_matrix_volume_replaces_a_zones_pending_volume(rig):
+    zone = rig.zones[0]
+    transport = rig.matrix._transport
+    transport.gate = asyncio.Event()
+
+    first = asyncio.create_task(zone.async_set_volume_level(0.5))
+    await asyncio.sleep(0)
+    # The queue is busy, so this waits as the zone's pending volume
+    await zone.async_set_volume_level(0.6)
+
+    everything = asyncio.create_task(rig.entity.async_set_volume_level(0.3))
+    await settle()
+    assert zone.volume_level == 0.3
+
+    transport.gate.set()
+    await asyncio.gather(first, everything)
+    await rig.hass.async_block_till_done()
+
+    assert "SET OUT1 VOL 60" not in transport.sent
+    assert [rig.matrix.get_output(z.zone_id).volume for z in rig.zones] == [30, 30, 30, 30]
+    assert zone.volume_level == 0.3
+
+
+async def test_group_source_is_shown_on_every_member_until_confirmed(rig):
+    leader, member = rig.zones[:2]
+    await leader.async_join_players([member.entity_id])
+    transport = rig.matrix._transport
+    transport.gate = asyncio.Event()
+
+    send = asyncio.create_task(leader.async_select_source("Input 3"))
+    await settle()
+    assert (leader.source, member.source) == ("Input 3", "Input 3")
+    assert rig.matrix.get_output(member.zone_id).input_channel == 1
+
+    transport.gate.set()
+    await send
+    await rig.hass.async_block_till_done()
+    assert rig.matrix.get_output(member.zone_id).input_channel == 3
+
+
+async def test_scene_restore_sends_only_the_differences(rig):
+    transport = rig.matrix._transport
+    await rig.entity.snapshot("evening")
+    await rig.matrix._process_event("SET OUT2 VOL 45")
+    await rig.matrix._process_event("SET OUT3 AS IN2")
+    transport.sent.clear()
+
+    await rig.entity.restore("evening")
+
+    assert sorted(set(transport.sent)) == ["SET OUT2 VOL 20", "SET OUT3 AS IN1"]
+    assert rig.entity.extra_state_attributes["last_restore_commands"] == 2
@@ -0,0 +1,84 @@
+"""Tests for auto-routing zones to an input while it has audio."""
+import asyncio
+
+import pytest
+
+from custom_components.acmax24.routing import AUTO_ROUTES_SCHEMA, AutoRouter
+
+
+@pytest.fixture
+def router(rig):
+    rules = AUTO_ROUTES_SCHEMA(
+        [{"input": 3, "zones": [1, 2], "volume": 40, "revert_after": 0.05}]
+    )
+    zones = {zone.zone_id: zone for zone in rig.zones}
+    router = AutoRouter(rig.hass, rig.hub, rules, rig.fades, zones)
+    router.async_start()
+    yield router
+    router.async_stop()
+
+
+async def signal(rig, input_idx, status):
+    await rig.matrix._process_event(f"IN{input_idx} SIG STA {status}")
+    await rig.hass.async_block_till_done()
+
+
+def routing(rig, *output_ids):
+    return [
+        (rig.matrix.get_output(idx).input_channel, rig.matrix.get_output(idx).volume)
+        for idx in output_ids
+    ]
+
+
+async def test_zones_are_routed_and_reverted(rig, router):
+    await signal(rig, 3, 3)
+    assert routing(rig, 1, 2, 3) == [(3, 40), (3, 40), (1, 20)]
+
+    await signal(rig, 3, 0)
+    await asyncio.sleep(0.1)
+    await rig.hass.async_block_till_done()
+    assert routing(rig, 1, 2, 3) == [(1, 20), (1, 20), (1, 20)]
+    assert (router.activations, router.reverts) == (1, 1)
+
+
+async def test_revert_leaves_zones_routed_elsewhere(rig, router):
+    await signal(rig, 3, 3)
+    await rig.matrix._process_event("SET OUT2 AS IN4")
+
+    await signal(rig, 3, 0)
+    await asyncio.sleep(0.1)
+    await rig.hass.async_block_till_done()
+    assert routing(rig, 1, 2) == [(1, 20), (4, 40)]
+
+
+async def test_audio_returning_cancels_the_revert(rig, router):
+    await signal(rig, 3, 3)
+    await signal(rig, 3, 0)
+    await signal(rig, 3, 3)
+    await asyncio.sleep(0.1)
+    await rig.hass.async_block_till_done()
+
+    assert routing(rig, 1, 2) == [(3, 40), (3, 40)]
+    assert (router.activations, router.reverts) == (1, 0)
+
+
+async def test_route_replaces_a_zones_queued_source(rig, router):
+    zone = rig.zones[0]
+    transport = rig.matrix._transport
+    transport.gate = asyncio.Event()
+    volume = asyncio.create_task(zone.async_set_volume_level(0.5))
+    await asyncio.sleep(0)
+    # Waits behind the volume, until the auto-route replaces it
+    await zone.async_select_source("Input 4")
+
+    # Not waiting for the switch to be sent, as the gate holds it
+    await rig.matrix._process_event("IN3 SIG STA 3")
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert zone.source == "Input 3"
+    transport.gate.set()
+    await volume
+    await rig.hass.async_block_till_done()
+
+    assert "SET OUT1 AS IN4" not in transport.sent
+    assert routing(rig, 1, 2) == [(3, 40), (3, 40)]